@@ -0,0 +1,68 @@
+import socket
+import struct
+import threading
+import time
+
+NTP_EPOCH_OFFSET = 2208988800
+_PACKET = struct.Struct('!BBbbIII4Q')
+
+
+def to_ntp(seconds):
+    """Unix时间(秒) -> 64位NTP时间戳"""
+    seconds += NTP_EPOCH_OFFSET
+    whole = int(seconds)
+    return whole << 32 | int((seconds - whole) * (1 << 32))
+
+
+class FakeNtpServer:
+    """
+    本地SNTP服务器替身
+    在回环地址上应答SNTP查询，时间戳按 本地时间 + offset 生成，用于测量SNTP同步误差
+    """
+
+    def __init__(self, offset=0.0, delay=0.0, stratum=2, answer_first=None, leap=0):
+        """
+        Args:
+            offset: 服务器时钟相对本地时钟的偏移(秒)
+            delay: 收到请求后到发出应答之间的等待时间(秒)，计入服务器处理时间，不影响偏移估计
+            stratum: 应答中的层级，0表示 Kiss-o'-Death（未同步）
+            answer_first: 只应答前几个请求，之后的请求全部丢弃（模拟丢包），None表示全部应答
+            leap: 应答中的闰秒指示，3表示服务器时钟未同步
+        """
+        self.offset = offset
+        self.delay = delay
+        self.stratum = stratum
+        self.answer_first = answer_first
+        self.leap = leap
+        self.requests = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.url = f"ntp://127.0.0.1:{self.sock.getsockname()[1]}"
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def _serve(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(512)
+            except OSError:
+                return   # 套接字已关闭
+            receive = time.time() + self.offset
+            if len(data) < _PACKET.size:
+                continue
+            self.requests += 1
+            if self.answer_first is not None and self.requests > self.answer_first:
+                continue
+            client_transmit = _PACKET.unpack_from(data)[10]
+            if self.delay:
+                time.sleep(self.delay)
+            transmit = time.time() + self.offset
+            reply = _PACKET.pack(self.leap << 6 | 4 << 3 | 4, self.stratum, 4, -20, 0, 0, 0x7F000001,
+                                 to_ntp(receive), client_transmit, to_ntp(receive), to_ntp(transmit))
+            self.sock.sendto(reply, address)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.sock.close()
@@ -0,0 +1,53 @@
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTimeServer:
+    """
+    本地时间服务器替身
+    在回环地址上提供HTTP服务，Date头按 本地时间 + offset 生成，用于测量时间同步误差
+    """
+
+    def __init__(self, offset=0.0, delay=0.0):
+        """
+        Args:
+            offset: 服务器时钟相对本地时钟的偏移(秒)
+            delay: 每次应答前额外等待的时间(秒)，模拟网络延迟
+        """
+        self.offset = offset
+        self.delay = delay
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _reply(self):
+                if server.delay:
+                    time.sleep(server.delay)
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def date_time_string(self, timestamp=None):
+                return formatdate(time.time() + server.offset, usegmt=True)
+
+            do_GET = _reply
+            do_HEAD = _reply
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,42 @@
+"""keyboard 替身：注册的回调保存在 hooks 中，可用 press()/release() 模拟按键"""
+hooks = {}
+release_hooks = {}
+pressed = set()
+
+
+def on_press_key(key, callback, suppress=False):
+    hooks.setdefault(key.lower(), []).append(callback)
+    return callback
+
+
+def on_release_key(key, callback, suppress=False):
+    release_hooks.setdefault(key.lower(), []).append(callback)
+    return callback
+
+
+def unhook(callback):
+    for table in (hooks, release_hooks):
+        for callbacks in table.values():
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+
+def is_pressed(key):
+    return key.lower() in pressed
+
+
+def press(key):
+    pressed.add(key.lower())
+    for callback in list(hooks.get(key.lower(), [])):
+        callback(None)
+
+
+def release(key):
+    pressed.discard(key.lower())
+    for callback in list(release_hooks.get(key.lower(), [])):
+        callback(None)
+
+
+def unhook_all():
+    hooks.clear()
+    release_hooks.clear()
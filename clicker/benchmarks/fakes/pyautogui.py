@@ -0,0 +1,24 @@
+"""pyautogui 替身：不产生真实输入，只记录调用"""
+PAUSE = 0.1
+FAILSAFE = True
+calls = []
+
+
+def position():
+    return (0, 0)
+
+
+def moveTo(x=None, y=None, *args, **kwargs):
+    calls.append(('moveTo', x, y))
+
+
+def mouseDown(x=None, y=None, *args, **kwargs):
+    calls.append(('mouseDown', x, y))
+
+
+def mouseUp(x=None, y=None, *args, **kwargs):
+    calls.append(('mouseUp', x, y))
+
+
+def doubleClick(x=None, y=None, *args, **kwargs):
+    calls.append(('doubleClick', x, y))
@@ -0,0 +1,182 @@
+"""
+无界面的 tkinter 替身，仅供基准测试使用
+控件只记录配置，不创建任何窗口；after() 的回调在 update() 时执行
+"""
+import itertools
+import time
+
+W, E, N, S = 'w', 'e', 'n', 's'
+LEFT, RIGHT, TOP, BOTTOM = 'left', 'right', 'top', 'bottom'
+BOTH, X, Y = 'both', 'x', 'y'
+END = 'end'
+VERTICAL, HORIZONTAL = 'vertical', 'horizontal'
+NORMAL, DISABLED = 'normal', 'disabled'
+SINGLE, BROWSE, MULTIPLE, EXTENDED = 'single', 'browse', 'multiple', 'extended'
+
+
+class Variable:
+    def __init__(self, master=None, value=None):
+        self._value = value
+        self._traces = []
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+        for callback in self._traces:
+            callback('', '', 'write')
+
+    def trace_add(self, mode, callback):
+        self._traces.append(callback)
+
+
+class StringVar(Variable):
+    def __init__(self, master=None, value=''):
+        super().__init__(master, value)
+
+
+class BooleanVar(Variable):
+    def __init__(self, master=None, value=False):
+        super().__init__(master, value)
+
+
+class IntVar(Variable):
+    def __init__(self, master=None, value=0):
+        super().__init__(master, value)
+
+
+class Misc:
+    def __init__(self, master=None, **options):
+        self.master = master
+        self.options = dict(options)
+
+    def config(self, **options):
+        self.options.update(options)
+
+    configure = config
+
+    def cget(self, key):
+        return self.options.get(key)
+
+    def grid(self, **options):
+        pass
+
+    def pack(self, **options):
+        pass
+
+    def bind(self, sequence=None, func=None, add=None):
+        pass
+
+    def focus_set(self):
+        pass
+
+    def destroy(self):
+        pass
+
+
+class Tk(Misc):
+    def __init__(self):
+        super().__init__()
+        self._after = {}
+        self._ids = itertools.count(1)
+
+    def title(self, text=None):
+        self.options['title'] = text
+
+    def protocol(self, name, func):
+        self.options[name] = func
+
+    def after(self, ms, func=None, *args):
+        after_id = f"after#{next(self._ids)}"
+        self._after[after_id] = (time.monotonic() + ms / 1000, func, args)
+        return after_id
+
+    def after_cancel(self, after_id):
+        self._after.pop(after_id, None)
+
+    def update(self):
+        """执行所有已到期的 after 回调"""
+        now = time.monotonic()
+        due = [(k, v) for k, v in list(self._after.items()) if v[0] <= now]
+        for after_id, (_, func, args) in due:
+            self._after.pop(after_id, None)
+            func(*args)
+
+    def mainloop(self):
+        pass
+
+
+class Frame(Misc):
+    pass
+
+
+class LabelFrame(Misc):
+    pass
+
+
+class Label(Misc):
+    pass
+
+
+class Button(Misc):
+    pass
+
+
+class Entry(Misc):
+    pass
+
+
+class Checkbutton(Misc):
+    pass
+
+
+class Spinbox(Misc):
+    pass
+
+
+class Scrollbar(Misc):
+    def set(self, *args):
+        pass
+
+
+class Listbox(Misc):
+    def __init__(self, master=None, **options):
+        super().__init__(master, **options)
+        self.items = []
+        self.selection = ()
+
+    def insert(self, index, *elements):
+        if index == END:
+            self.items.extend(elements)
+        else:
+            self.items[index:index] = elements
+
+    def delete(self, first, last=None):
+        if last == END:
+            del self.items[first:]
+        elif last is None:
+            del self.items[first]
+        else:
+            del self.items[first:last + 1]
+
+    def get(self, index):
+        return self.items[index]
+
+    def nearest(self, y):
+        return min(max(0, len(self.items) - 1), y // 20)
+
+    def selection_set(self, first, last=None):
+        self.selection = tuple(sorted(set(self.selection) | {first}))
+
+    def selection_clear(self, first, last=None):
+        self.selection = ()
+
+    def curselection(self):
+        return self.selection
+
+    def size(self):
+        return len(self.items)
+
+    def yview(self, *args):
+        pass
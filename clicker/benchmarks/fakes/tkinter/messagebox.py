@@ -0,0 +1,13 @@
+messages = []   # [(类型, 标题, 内容), ...]
+
+
+def showinfo(title=None, message=None, **options):
+    messages.append(('info', title, message))
+
+
+def showwarning(title=None, message=None, **options):
+    messages.append(('warning', title, message))
+
+
+def showerror(title=None, message=None, **options):
+    messages.append(('error', title, message))
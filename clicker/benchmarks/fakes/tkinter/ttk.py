@@ -0,0 +1 @@
+from tkinter import Frame, LabelFrame, Label, Button, Entry, Checkbutton, Spinbox, Scrollbar  # noqa: F401
@@ -0,0 +1,267 @@
+"""
+定时点击器基准测试
+用无界面的 tkinter/pyautogui/keyboard 替身和本地时间服务器驱动 AutoClickerGUI，
+测量触发迟到、点击吞吐、线程/进程执行器对比、等待期间CPU占用和时间同步误差（HTTP/SNTP），结果写入JSON文件便于对比不同版本
+
+用法:
+    python clicker/benchmarks/run_benchmarks.py [-o 结果文件] [--quick]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, 'fakes'))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import tkinter as tk  # noqa: E402  （替身）
+
+import clock_sync  # noqa: E402
+from click_pipeline import ClickWorkerPool  # noqa: E402
+from click_plan import compile_plan  # noqa: E402
+from event_log import log  # noqa: E402
+from fake_ntp_server import FakeNtpServer  # noqa: E402
+from fake_time_server import FakeTimeServer  # noqa: E402
+from input_backend import RecordingBackend, DOWN  # noqa: E402
+from instrumentation import Timeline, summarize  # noqa: E402
+from process_pool import ProcessClickPool  # noqa: E402
+from scheduler import Job  # noqa: E402
+
+
+def make_app(workdir, servers):
+    """
+    在临时目录中创建使用替身模块和本地时间服务器的 AutoClickerGUI
+    Returns:
+        界面背后的 ClickerEngine
+    """
+    import clicker
+    os.chdir(workdir)
+    with open('settings.json', 'w') as f:
+        json.dump({'input_backend': 'recording', 'sync_mode': 'fast', 'jobs': [],
+                   'warmup_seconds': 0.5, 'log_level': 'WARNING', 'log_file': ''}, f)
+    with open('coordinates.json', 'w') as f:
+        json.dump([[10 * i, 10 * i] for i in range(20)], f)
+    clock_sync.DEFAULT_SERVERS = servers
+    return clicker.AutoClickerGUI(tk.Tk()).engine
+
+
+def wait_synced(engine, timeout=10):
+    end = time.monotonic() + timeout
+    while not engine.clock.synced and time.monotonic() < end:
+        time.sleep(0.05)
+
+
+def bench_trigger(engine, trials):
+    """触发器单独测量：等待到 now+200ms 时的触发误差"""
+    errors = []
+    for _ in range(trials):
+        errors.append(abs(engine.trigger.wait(engine.clock.now_us() + 200_000)))
+    return summarize(errors)
+
+
+def bench_scheduled_run(engine):
+    """完整定时流程：预热 -> 触发 -> 第一批点击，读取时间线中的迟到统计"""
+    target = engine.get_network_time() + timedelta(seconds=2)
+    job = Job('bench', target.strftime('%H:%M:%S.%f')[:-3], date=target.strftime('%Y-%m-%d'))
+    fired = len(engine.fire_errors)
+    engine.scheduler.add_job(job)
+    end = time.monotonic() + 10
+    while len(engine.fire_errors) == fired and time.monotonic() < end:
+        time.sleep(0.01)
+    time.sleep(0.3)
+    engine.is_running = False
+    time.sleep(0.3)
+    report = engine.timeline.report()
+    return {
+        'fire_error_us': engine.fire_errors[-1] if len(engine.fire_errors) > fired else None,
+        'trigger_lateness_us': report['trigger_lateness_us'],
+        'first_event_lateness_us': report['first_event_lateness_us'],
+        'event_lateness': report['event_lateness'],
+        'jitter': report['jitter']
+    }
+
+
+def bench_throughput(coordinate_counts, thread_counts, seconds):
+    """点击吞吐：不同坐标数量和线程数下每秒完成的双击次数（录制后端，间隔为0）"""
+    results = []
+    for workers in thread_counts:
+        backend = RecordingBackend()
+        pool = ClickWorkerPool(backend, workers)
+        pool.start()
+        for count in coordinate_counts:
+            plan = compile_plan([(i, i) for i in range(count)], workers, intra_delay=0, click_interval=0)
+            backend.events.clear()
+            rounds = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                pool.run_round(plan.groups)
+                rounds += 1
+            elapsed = time.perf_counter() - start
+            downs = sum(1 for e in backend.events if e[1] == DOWN)
+            results.append({
+                'threads': workers,
+                'coordinates': count,
+                'rounds': rounds,
+                'double_clicks_per_s': round(downs / 2 / elapsed),
+                'batches_per_s': round(backend.batches / elapsed)
+            })
+        pool.shutdown()
+    return results
+
+
+def _burn(stop):
+    """模拟主进程中的界面/同步等Python负载，持续占用GIL"""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def bench_executors(coordinate_counts, workers, seconds):
+    """
+    线程池与多进程执行器对比：每秒完成的事件数和事件迟到，
+    分别在主进程空闲和有一个占用GIL的Python线程时测量（录制后端，双击间隔1ms）
+    """
+    results = []
+    for name in ('thread', 'process'):
+        if name == 'thread':
+            pool = ClickWorkerPool(RecordingBackend(), workers)
+        else:
+            pool = ProcessClickPool('recording', workers)
+        pool.start()
+        for count in coordinate_counts:
+            plan = compile_plan([(i, i) for i in range(count)], workers, intra_delay=0.001, click_interval=0)
+            pool.warm_up(plan.groups)
+            for busy in (False, True):
+                stop = threading.Event()
+                if busy:
+                    threading.Thread(target=_burn, args=(stop,), daemon=True).start()
+                timeline = Timeline()
+                rounds = 0
+                start = time.perf_counter()
+                while time.perf_counter() - start < seconds:
+                    pool.run_round(plan.groups, timeline)
+                    rounds += 1
+                elapsed = time.perf_counter() - start
+                stop.set()
+                report = timeline.report()
+                results.append({
+                    'executor': name,
+                    'workers': workers,
+                    'coordinates': count,
+                    'parent_busy': busy,
+                    'rounds': rounds,
+                    'events_per_s': round(rounds * plan.event_count / elapsed),
+                    'event_lateness': report['event_lateness'],
+                    'round_duration': report['round_duration']
+                })
+        pool.close()
+    return results
+
+
+def bench_idle_cpu(engine, seconds):
+    """等待期间CPU占用：有一个1小时后的任务时，整个进程的CPU时间/墙钟时间"""
+    target = engine.get_network_time() + timedelta(hours=1)
+    engine.scheduler.add_job(Job('idle', target.strftime('%H:%M:%S'), date=target.strftime('%Y-%m-%d')))
+    time.sleep(0.2)
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    time.sleep(seconds)
+    cpu = time.process_time() - cpu0
+    wall = time.perf_counter() - wall0
+    engine.scheduler.remove_job('idle')
+    return {'seconds': round(wall, 3), 'cpu_percent': round(100 * cpu / wall, 2)}
+
+
+def _measure_sync(clock, offset):
+    start = time.perf_counter()
+    clock.sync_once()
+    result = {
+        'true_offset_us': int(offset * 1_000_000),
+        'estimated_offset_us': round(clock.offset_us()),
+        'abs_error_us': round(abs(clock.offset_us() - offset * 1_000_000)),
+        'reported_bound_us': clock.error_us(),
+        'sync_seconds': round(time.perf_counter() - start, 3)
+    }
+    clock.close()
+    return result
+
+
+def bench_sync_error(offset, modes):
+    """
+    时间同步误差：本地时间服务器带已知偏移时，估计偏移与真实偏移之差
+    分别测量HTTP各同步模式、SNTP，以及SNTP端口不通时回退到HTTP的情况
+    """
+    server = FakeTimeServer(offset=offset).start()
+    ntp_server = FakeNtpServer(offset=offset).start()
+    blocked = FakeNtpServer(offset=offset)   # 只绑定端口不应答，模拟UDP被封
+    results = {}
+    try:
+        for mode in modes:
+            results[mode] = _measure_sync(clock_sync.ClockSync([server.url], mode=mode), offset)
+        results['sntp'] = _measure_sync(clock_sync.ClockSync([ntp_server.url]), offset)
+        results['sntp_blocked_http_fallback'] = _measure_sync(
+            clock_sync.ClockSync([blocked.url, server.url], mode='fast', timeout=0.5), offset)
+    finally:
+        server.stop()
+        ntp_server.stop()
+        blocked.stop()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=HERE,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="定时点击器基准测试")
+    parser.add_argument('-o', '--output', default='bench_results.json', help="结果JSON文件")
+    parser.add_argument('--quick', action='store_true', help="缩短各项测量时间")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    quick = args.quick
+
+    server = FakeTimeServer(offset=0.25).start()
+    workdir = tempfile.mkdtemp(prefix='clicker_bench_')
+    engine = make_app(workdir, [server.url])
+    wait_synced(engine)
+    log.configure(level='WARNING')
+
+    results = {
+        'meta': {
+            'git_revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.time()
+        },
+        'trigger': bench_trigger(engine, 5 if quick else 20),
+        'scheduled_run': bench_scheduled_run(engine),
+        'idle_cpu': bench_idle_cpu(engine, 1.0 if quick else 5.0),
+        'throughput': bench_throughput([10, 100] if quick else [10, 100, 1000],
+                                       [1, 2] if quick else [1, 2, 4, 8],
+                                       0.2 if quick else 1.0),
+        'executors': bench_executors([10, 100] if quick else [10, 100, 1000],
+                                     2 if quick else max(2, (os.cpu_count() or 2) // 2),
+                                     0.3 if quick else 2.0),
+        'sync_error': bench_sync_error(1.2345, ['fast'] if quick else ['fast', 'bracket'])
+    }
+    server.stop()
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"结果已写入 {output}")
+
+
+if __name__ == "__main__":
+    main()
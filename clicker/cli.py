@@ -0,0 +1,113 @@
+"""
+定时点击器命令行模式（无界面）
+加载设置文件中的任务，同步时钟、预热并等待触发，不导入 tkinter 和 keyboard，
+适合从脚本批量启动定时执行
+
+用法:
+    python clicker/cli.py                              # 执行最近的一个任务后退出
+    python clicker/cli.py --job 默认任务 --duration 3
+    python clicker/cli.py --at 20:00:00.000 --date 2026-10-18
+    python clicker/cli.py --daemon                     # 按设置文件中的所有任务持续运行
+"""
+import time
+
+START_NS = time.perf_counter_ns()   # 尽早记录，用于测量启动到就绪的耗时（不含解释器自身启动）
+
+import argparse
+import multiprocessing
+import threading
+
+from event_log import log
+from engine import ClickerEngine, RUN_ARMED, RUN_STARTED
+from scheduler import Job
+
+
+def elapsed_ms(stamp_ns):
+    return round((stamp_ns - START_NS) / 1_000_000, 3)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="定时点击器命令行模式")
+    parser.add_argument('--job', help="执行设置文件中指定名称的任务")
+    parser.add_argument('--at', help="临时任务的执行时刻 HH:MM[:SS[.mmm]]")
+    parser.add_argument('--date', help="临时任务的日期 YYYY-MM-DD，默认每天")
+    parser.add_argument('--duration', type=float, default=5.0, help="每次触发后持续点击的秒数")
+    parser.add_argument('--warmup', type=float, help="覆盖设置中的预热提前量(秒)")
+    parser.add_argument('--sync-timeout', type=float, default=0.0,
+                        help="预热前等待首次时钟同步的最长秒数；默认不等待，同步结果在触发前自动生效")
+    parser.add_argument('--daemon', action='store_true', help="持续运行所有任务，直到 Ctrl+C")
+    parser.add_argument('--settings', default='settings.json', help="设置文件")
+    parser.add_argument('--coordinates', default='coordinates.json', help="坐标文件")
+    args = parser.parse_args(argv)
+    if args.job and args.at:
+        parser.error("--job 和 --at 只能指定一个")
+    if args.daemon and (args.job or args.at):
+        parser.error("--daemon 按设置文件运行所有任务，不能与 --job/--at 同时使用")
+    return parser, args
+
+
+def main(argv=None):
+    parser, args = parse_args(argv)
+    engine = ClickerEngine(args.coordinates, args.settings)
+    engine.load()
+    if args.warmup is not None:
+        engine.warmup_seconds = args.warmup
+
+    # 只保留本次要执行的任务（不写回设置文件）
+    if args.at:
+        try:
+            engine.scheduler.set_jobs([Job("命令行任务", args.at, date=args.date)])
+        except ValueError as e:
+            parser.error(f"请输入有效的时间: {str(e)}")
+    elif args.job:
+        job = engine.scheduler.jobs.get(args.job)
+        if job is None:
+            parser.error(f"找不到任务: {args.job}")
+        engine.scheduler.set_jobs([job])
+    if engine.scheduler.peek() is None:
+        parser.error("没有可执行的任务")
+
+    armed = {}
+
+    def on_event(event, *details):
+        if event == RUN_ARMED:
+            armed['ns'] = time.perf_counter_ns()
+            log.info("已预热，等待触发", start_to_armed_ms=elapsed_ms(armed['ns']))
+        elif event == RUN_STARTED:
+            timer = threading.Timer(args.duration, engine.stop_clicking)
+            timer.daemon = True
+            timer.start()
+
+    engine.on_event = on_event
+    engine.start(schedule=args.daemon)
+    log.info("已启动", start_to_ready_ms=elapsed_ms(time.perf_counter_ns()))
+
+    # 触发器粗等待期间会重新读取时钟模型，后台同步完成后自动修正目标，这里只按需等待首次同步
+    end = time.monotonic() + args.sync_timeout
+    while not engine.clock.synced and time.monotonic() < end:
+        time.sleep(0.01)
+    log.info(engine.describe_next_run())
+
+    try:
+        if args.daemon:
+            while True:
+                time.sleep(1)
+        else:
+            # run_next() 在任务被修改、预热失败或错过执行时刻时返回None，任务跳过后可能已没有下一次执行
+            job = None
+            while job is None and engine.scheduler.peek() is not None:
+                job = engine.run_next()
+            if job is None:
+                log.warning("没有剩余的任务，退出")
+            else:
+                log.info("命令行执行完成", job=job.name, fire_error_us=engine.fire_errors[-1],
+                         start_to_armed_ms=elapsed_ms(armed['ns']), clock_synced=engine.clock.synced)
+    except KeyboardInterrupt:
+        log.info("已中断")
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()   # 打包后的程序中，多进程执行器的工作进程在这里进入工作函数而不是再次运行主程序
+    main()
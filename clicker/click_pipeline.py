@@ -0,0 +1,153 @@
+import multiprocessing
+import queue
+import threading
+import time
+
+from event_log import log, DEBUG
+from instrumentation import DISPATCH, EVENT, ROUND_START, ROUND_END
+
+def click_worker_count():
+    """用于点击的线程数：预留2个核心，至少保留1个"""
+    return max(1, multiprocessing.cpu_count() // 2 - 1)
+
+
+def replay_group(group, backend, start_ns, timeline=None, group_index=0):
+    """
+    按时间偏移回放一个线程的事件计划
+    Args:
+        group: GroupPlan
+        backend: 输入后端
+        start_ns: 本轮开始时刻（perf_counter_ns）
+        timeline: 记录每批事件实际提交时刻的 Timeline，为None时不记录
+        group_index: 组号，写入时间线
+    """
+    log_clicks = log.enabled(DEBUG)  # 只判断一次，关闭时循环内没有任何日志开销
+    for offset, events, labels in zip(group.batch_offsets, group.batches, group.labels):
+        wait_ns = start_ns + offset - time.perf_counter_ns()
+        if wait_ns > 0:
+            time.sleep(wait_ns / 1_000_000_000)
+        backend.send(events)
+        if timeline is not None:
+            timeline.record(EVENT, time.perf_counter_ns(), start_ns + offset, group_index << 16 | len(events))
+        if log_clicks:
+            for index, x, y in labels:
+                log.debug("双击坐标", index=index + 1, x=x, y=y)
+
+
+class ClickWorkerPool:
+    """
+    长期存在的点击线程池
+    每个工作线程有自己的容量为1的任务队列，一轮点击把各组分发给工作线程后
+    等待全部完成才返回，多轮、多次执行之间复用同一批线程且不会重叠
+    """
+
+    def __init__(self, backend, workers=None):
+        """
+        Args:
+            backend: 输入后端（InputBackend）
+            workers: 工作线程数，默认按CPU核心数计算
+        """
+        self.backend = backend
+        self.size = workers or click_worker_count()
+        self._queues = [queue.Queue(maxsize=1) for _ in range(self.size)]
+        self._done = queue.Queue()
+        self._threads = []
+        self._round_lock = threading.Lock()   # 同一时刻只允许一轮点击在执行
+
+    def start(self):
+        """启动工作线程（已启动时直接返回），线程阻塞在各自队列上等待任务"""
+        if self._threads:
+            return
+        self._threads = [
+            threading.Thread(target=self._worker, args=(q,), daemon=True, name=f"Group-{i+1}")
+            for i, q in enumerate(self._queues)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def _worker(self, tasks):
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            try:
+                replay_group(*task)
+            except Exception as e:
+                log.error("点击执行出错", error=str(e))
+            finally:
+                self._done.put(None)
+
+    def run_round(self, groups, timeline=None):
+        """
+        执行一轮点击：各组以同一时刻为基准回放，全部完成后返回
+        Args:
+            groups: ClickPlan.groups，组数不超过线程数
+            timeline: 记录本轮时间线的 Timeline，为None时不记录
+        """
+        with self._round_lock:
+            start_ns = time.perf_counter_ns()
+            if timeline is not None:
+                timeline.record(ROUND_START, start_ns)
+            for i, (q, group) in enumerate(zip(self._queues, groups)):
+                q.put((group, self.backend, start_ns, timeline, i))
+            for _ in groups:
+                self._done.get()
+            if timeline is not None:
+                timeline.record(ROUND_END, time.perf_counter_ns())
+
+    def warm_up(self, groups=()):
+        """预先访问输入后端（后端所需的模块在创建后端时已导入）"""
+        self.backend.warm_up()
+
+    def shutdown(self):
+        """结束所有工作线程"""
+        for q in self._queues:
+            q.put(None)
+        self._threads = []
+
+    def close(self):
+        """结束工作线程并关闭输入后端"""
+        self.shutdown()
+        self.backend.close()
+
+
+class ArmedRun:
+    """
+    预热好的一次点击执行
+    prepare() 在截止时刻前确保执行器的工作线程/进程和输入后端已就绪；
+    fire() 到点后只需把编译好的计划分发给等待中的工作线程/进程
+    """
+
+    def __init__(self, pool, plan, is_running, timeline=None):
+        """
+        Args:
+            pool: ClickWorkerPool 或 ProcessClickPool 实例
+            plan: 编译好的 ClickPlan，组数不超过执行器大小
+            is_running: 返回是否继续执行的函数
+            timeline: 记录本次执行时间线的 Timeline，为None时不记录
+        """
+        self.pool = pool
+        self.plan = plan
+        self.is_running = is_running
+        self.timeline = timeline
+        self.prepared = False
+
+    def prepare(self):
+        """预热：启动工作线程/进程、预先初始化输入后端（多进程执行器同时把计划写入共享内存）"""
+        self.pool.start()
+        self.pool.warm_up(self.plan.groups)
+        self.prepared = True
+        log.info("预热完成", groups=len(self.plan.groups), events=self.plan.event_count)
+
+    def fire(self):
+        """开始点击，在当前线程逐轮分发计划，直到 is_running() 为False"""
+        if not self.prepared:
+            self.prepare()
+        if self.timeline is not None:
+            self.timeline.record(DISPATCH, time.perf_counter_ns())
+        while self.is_running():
+            self.pool.run_round(self.plan.groups, self.timeline)
+            log.debug("完成一轮点击")
+            # 等待设定的间隔后进行下一轮
+            time.sleep(self.plan.round_interval)
+        log.info("点击线程结束")
@@ -0,0 +1,123 @@
+from array import array
+
+from input_backend import MOVE, DOWN, UP
+
+DOUBLE_CLICK = (MOVE, DOWN, UP, DOWN, UP)     # 一次双击的事件序列
+
+
+class GroupPlan:
+    """
+    单个点击线程负责的事件计划
+    事件按时间偏移分批，同一批事件一次提交给输入后端
+    """
+
+    __slots__ = ('offsets', 'xs', 'ys', 'actions', 'batch_offsets', 'batches', 'labels')
+
+    def __init__(self, offsets, xs, ys, actions, indices):
+        """
+        Args:
+            offsets: 每个事件相对一轮开始的时间偏移(纳秒)
+            xs, ys: 事件坐标
+            actions: 事件类型
+            indices: 每次双击对应的坐标序号（与MOVE事件一一对应，-1表示不输出日志）
+        """
+        self.offsets = offsets
+        self.xs = xs
+        self.ys = ys
+        self.actions = actions
+
+        # 回放用的只读视图：按时间偏移聚合成批
+        batch_offsets = array('q')
+        batches = []
+        labels = []
+        move_index = 0
+        for i in range(len(offsets)):
+            event = (actions[i], xs[i], ys[i])
+            if not batch_offsets or offsets[i] != batch_offsets[-1]:
+                batch_offsets.append(offsets[i])
+                batches.append([])
+                labels.append([])
+            batches[-1].append(event)
+            if actions[i] == MOVE:
+                if indices[move_index] >= 0:
+                    labels[-1].append((indices[move_index], xs[i], ys[i]))
+                move_index += 1
+        self.batch_offsets = batch_offsets
+        self.batches = tuple(tuple(b) for b in batches)
+        self.labels = tuple(tuple(l) for l in labels)
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+class ClickPlan:
+    """
+    编译好的点击计划（不可变）
+    执行器只需按组、按时间偏移回放事件，不再在每轮重新分组和计算
+    """
+
+    __slots__ = ('groups', 'round_interval', 'coordinate_count', 'key')
+
+    def __init__(self, groups, round_interval, coordinate_count, key):
+        self.groups = tuple(groups)
+        self.round_interval = round_interval
+        self.coordinate_count = coordinate_count
+        self.key = key
+
+    @property
+    def event_count(self):
+        return sum(len(g) for g in self.groups)
+
+    @property
+    def round_duration_ns(self):
+        """一轮中最后一批事件的时间偏移"""
+        return max((g.batch_offsets[-1] for g in self.groups if len(g)), default=0)
+
+
+def compile_plan(coordinates, workers, double_clicks=2, intra_delay=0.01, click_interval=0.1):
+    """
+    把坐标列表编译成点击计划
+    Args:
+        coordinates: [(x, y), ...]
+        workers: 点击线程数，坐标平均分配到各线程
+        double_clicks: 每个坐标连续双击的次数
+        intra_delay: 同一坐标两次双击之间的间隔(秒)
+        click_interval: 每轮之间的间隔(秒)
+    """
+    coordinates = [tuple(c) for c in coordinates]
+    key = (tuple(coordinates), workers, double_clicks, intra_delay, click_interval)
+    delay_ns = int(intra_delay * 1_000_000_000)
+
+    groups = []
+    if coordinates:
+        per_group = -(-len(coordinates) // workers)  # 向上取整除法
+        for start in range(0, len(coordinates), per_group):
+            offsets, xs, ys, actions, indices = array('q'), array('i'), array('i'), array('b'), array('i')
+            t = 0
+            for index, (x, y) in enumerate(coordinates[start:start + per_group], start):
+                for repeat in range(double_clicks):
+                    if repeat:
+                        t += delay_ns
+                    for action in DOUBLE_CLICK:
+                        offsets.append(t)
+                        xs.append(x)
+                        ys.append(y)
+                        actions.append(action)
+                    # 只在每个坐标的最后一次双击输出日志
+                    indices.append(index if repeat == double_clicks - 1 else -1)
+            groups.append(GroupPlan(offsets, xs, ys, actions, indices))
+
+    return ClickPlan(groups, click_interval, len(coordinates), key)
+
+
+class PlanCompiler:
+    """带缓存的计划编译器：坐标和点击设置未变化时直接复用上一次的计划"""
+
+    def __init__(self):
+        self._plan = None
+
+    def compile(self, coordinates, workers, double_clicks=2, intra_delay=0.01, click_interval=0.1):
+        key = (tuple(tuple(c) for c in coordinates), workers, double_clicks, intra_delay, click_interval)
+        if self._plan is None or self._plan.key != key:
+            self._plan = compile_plan(coordinates, workers, double_clicks, intra_delay, click_interval)
+        return self._plan
@@ -1,15 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyautogui
-import json
-import threading
-import time
-from datetime import datetime, timedelta
 import keyboard
-import requests
+import multiprocessing
 import sys
 import os
 
+from event_log import log
+from scheduler import Job, WEEKDAY_NAMES
+from engine import ClickerEngine, COORDINATES_CHANGED, JOBS_CHANGED, RUN_STARTED, RUN_STOPPED
+from recorder import HotkeyRecorder
+from virtual_list import VirtualList
+
 def get_resource_path(relative_path):
     """获取资源文件的绝对路径"""
     try:
@@ -23,183 +24,54 @@ def get_resource_path(relative_path):
 class AutoClickerGUI:
     """
     自动点击器的图形界面类
-    实现了坐标记录、定时执行、多线程点击等功能
+    只负责界面、热键和坐标录制，定时调度和点击执行由 ClickerEngine 完成
     """
     
-    def __init__(self, root):
+    def __init__(self, root, engine=None):
         """
         初始化自动点击器
         Args:
             root: tkinter主窗口实例
+            engine: ClickerEngine 实例，默认新建
         """
         # GUI相关
         self.root = root                  # 主窗口实例
+        self.engine = engine or ClickerEngine()
+        self.engine.on_event = self.on_engine_event
         
-        # 核心状态变量
-        self.coordinates = []             # 存储所有记录的坐标点 [(x1,y1), (x2,y2),...]
-        self.is_running = False           # 是否正在执行点击
-        self.recording = False            # 是否处于录制状态
-        self.scheduled_time = "20:00"     # 计划执行时间 "HH:MM"格式
-        self.click_interval = 0.1         # 点击间隔时间(秒)
-        self.last_record_time = 0         # 上次记录坐标的时间戳
-        self.record_cooldown = 0.5        # 记录坐标的冷却时间(秒)
+        # 坐标录制：在F9按下的瞬间记录鼠标坐标，F8停止（F8回调来自keyboard线程，转到Tk线程处理）
+        self.recorder = HotkeyRecorder(self.engine.add_coordinate,
+                                       on_stop=lambda: self.root.after(0, self.stop_recording))
         self.update_timer = None          # 时间更新定时器
 
         # GUI组件
         self.status_label = None          # 状态显示标签
-        self.coordinate_listbox = None    # 坐标列表显示框
+        self.coordinate_list = None       # 坐标列表（虚拟化，只显示可见行）
+        self.filter_var = None            # 坐标过滤输入变量
         self.start_button = None          # 开始按钮
         self.stop_button = None           # 停止按钮
         self.clear_button = None          # 清空按钮
         self.interval_var = None          # 点击间隔输入变量
-
-        # 文件路径
-        self.coordinates_file = 'coordinates.json'    # 坐标保存文件
-        self.settings_file = 'settings.json'         # 设置保存文件
-
-        # 线程相关
-        self.schedule_thread = None       # 定时任务线程
-        self.update_time_thread = None    # 时间更新线程
+        self.job_listbox = None           # 定时任务列表显示框
 
         keyboard.on_press_key('esc', lambda _: self.emergency_stop())
         
         self.setup_gui()
-        self.load_coordinates()
-        self.load_settings()
+        self.engine.load()
+        self.interval_var.set(str(int(self.engine.click_interval * 1000)))
+        self.engine.start()
         self.start_time_update()  # 启动时间更新
-        
-        # 启动定时任务和时间更新
-        self.schedule_thread = threading.Thread(target=self.run_schedule, daemon=True)
-        self.schedule_thread.start()
-        self.update_time_thread = threading.Thread(target=self.update_network_time, daemon=True)
-        self.update_time_thread.start()
-
-    def get_network_time(self):
-        """获取网络时间"""
-        try:
-            # 使用多个服务器交叉验证时间
-            servers = [
-                'https://www.baidu.com',
-                'https://www.taobao.com',
-                'https://www.jd.com'
-            ]
-            
-            for server in servers:
-                try:
-                    start_time = time.time()
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                    }
-                    response = requests.get(server, headers=headers, timeout=2)
-                    end_time = time.time()
-                    
-                    if response.status_code == 200:
-                        server_time = datetime.strptime(
-                            response.headers['date'], 
-                            '%a, %d %b %Y %H:%M:%S GMT'
-                        )
-                        
-                        # 计算网络延迟并补偿
-                        network_delay = (end_time - start_time) / 2
-                        beijing_time = server_time + timedelta(hours=8, seconds=network_delay)
-                        print(f"从 {server} 获取时间成功，网络延迟: {network_delay*1000:.2f}ms")
-                        return beijing_time
-                        
-                except Exception as e:
-                    print(f"从 {server} 获取时间失败: {str(e)}")
-                    continue
-                
-            raise Exception("所有服务器都失败")
-            
-        except Exception as e:
-            print(f"网络时间获取失败，使用本地时间: {str(e)}")
-            return datetime.now()
 
-    def update_network_time(self):
-        """定期更新网络时间（毫秒级）"""
-        while True:
-            try:
-                current_time = self.get_network_time()
-                self.update_status_with_time(current_time)
-                
-                # 根据时间段调整更新频率
-                current_hour = current_time.hour
-                current_minute = current_time.minute
-                current_second = current_time.second
-                
-                if (current_hour == 19 and current_minute == 59 and 
-                    current_second >= 55):
-                    time.sleep(0.01)  # 最后5秒，每10毫秒更新一次
-                elif (current_hour == 19 and current_minute == 59 and 
-                      current_second >= 50):
-                    time.sleep(0.05)  # 最后10秒，每50毫秒更新一次
-                elif (current_hour == 19 and current_minute == 59):
-                    time.sleep(0.1)   # 最后1分钟，每100毫秒更新一次
-                elif (current_hour == 19 and current_minute >= 58):
-                    time.sleep(0.5)   # 最后2分钟，每500毫秒更新一次
-                else:
-                    time.sleep(10)     # 其他时间每10秒更新一次
-                    
-            except Exception as e:
-                print(f"时间更新失败: {str(e)}")
-                time.sleep(0.1)  # 出错后等待100毫秒再试
-    def update_status_with_time(self, current_time):
-        """这个方法现在只用于初始化显示"""
-        pass  # 不再需要这个方法的实现
-
-    def run_schedule(self):
-        """运行定时任务（使用网络时间）"""
-        while True:
-            try:
-                # 获取网络时间
-                current_time = self.get_network_time()
-                current_ms = int(time.time() * 1000) % 1000
-                
-                # 获取配置的时间
-                scheduled_hour = int(self.scheduled_time.split(':')[0])
-                scheduled_minute = int(self.scheduled_time.split(':')[1])
-                
-                # 打印详细的时间信息
-                print(f"当前时间: {current_time.strftime('%H:%M:%S')}.{current_ms:03d}")
-                print(f"目标时间: {scheduled_hour:02d}:{scheduled_minute:02d}:00.000")
-                print(f"运行状态: {'运行中' if self.is_running else '等待中'}")
-                
-                # 更精确的时间判断
-                is_target_time = (
-                    current_time.hour == scheduled_hour and 
-                    current_time.minute == scheduled_minute and 
-                    current_time.second == 0 and 
-                    current_ms >0 and  # 在前100毫秒内触发
-                    not self.is_running
-                )
-                
-                if is_target_time:
-                    print(f"\n=== 触发执行时间 ===")
-                    print(f"时间: {current_time.strftime('%H:%M:%S')}.{current_ms:03d}")
-                    print(f"坐标数量: {len(self.coordinates)}")
-                    self.root.after(0, self.start_clicking)
-                    time.sleep(1)  # 等待1秒避免重复执行
-                    continue
-                
-                # 动态调整检查频率
-                if current_time.hour == scheduled_hour:
-                    if current_time.minute == scheduled_minute:
-                        time.sleep(0.001)  # 目标分钟：每1毫秒检查一次
-                        print("高频检查中...")
-                    elif current_time.minute == scheduled_minute - 1:
-                        if current_time.second >= 55:
-                            time.sleep(0.01)   # 最后5秒：每10毫秒检查一次
-                            print("准备阶段...")
-                        else:
-                            time.sleep(0.1)    # 最后1分钟：每100毫秒检查一次
-                    else:
-                        time.sleep(1)          # 同一小时内：每秒检查一次
-                else:
-                    time.sleep(5)              # 其他时间：每5秒检查一次
-                    
-            except Exception as e:
-                print(f"定时任务出错: {str(e)}")
-                time.sleep(1)  # 出错后等待1秒再试
+    def on_engine_event(self, event, *details):
+        """引擎状态变化回调（可能来自后台线程），转到Tk线程中更新界面"""
+        if event == COORDINATES_CHANGED:
+            self.root.after(0, self.apply_coordinate_change, *details)
+        elif event == JOBS_CHANGED:
+            self.root.after(0, self.update_job_listbox)
+        elif event == RUN_STARTED:
+            self.root.after(0, self.show_running_state)
+        elif event == RUN_STOPPED:
+            self.root.after(0, self.update_after_stop)
 
     def setup_gui(self):
         """设置图形界面，创建并布局所有GUI组件"""
@@ -211,12 +83,17 @@ class AutoClickerGUI:
         list_frame = ttk.LabelFrame(main_frame, text="记录的坐标", padding="5")
         list_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), padx=5, pady=5)
         
-        self.coordinate_listbox = tk.Listbox(list_frame, height=10, width=40)
-        self.coordinate_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # 过滤：输入文字只显示包含该文字的坐标，输入 "a-b" 只显示第a到第b个坐标
+        filter_frame = ttk.Frame(list_frame)
+        filter_frame.pack(side=tk.TOP, fill=tk.X)
+        ttk.Label(filter_frame, text="过滤(文字或a-b):").pack(side=tk.LEFT)
+        self.filter_var = tk.StringVar(value="")
+        self.filter_var.trace_add('write', lambda *_: self.coordinate_list.set_filter(self.filter_var.get()))
+        ttk.Entry(filter_frame, textvariable=self.filter_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
         
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.coordinate_listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.coordinate_listbox.configure(yscrollcommand=scrollbar.set)
+        # Shift点击范围选择，Ctrl点击多选，Ctrl+A全选当前过滤结果
+        self.coordinate_list = VirtualList(list_frame, height=10, width=40)
+        self.coordinate_list.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         
         # 控制按钮
         control_frame = ttk.Frame(main_frame)
@@ -248,7 +125,7 @@ class AutoClickerGUI:
         ttk.Label(click_frame, text="点击间隔(毫秒):").grid(row=0, column=0, padx=5)
         
         # 点击间隔输入
-        self.interval_var = tk.StringVar(value=str(int(self.click_interval * 1000)))
+        self.interval_var = tk.StringVar(value="100")
         interval_spinbox = ttk.Spinbox(
             click_frame, 
             from_=1,  # 最小1毫秒
@@ -262,255 +139,163 @@ class AutoClickerGUI:
         ttk.Button(click_frame, text="保存频率设置", 
                    command=self.save_click_settings).grid(row=0, column=2, padx=5)
         
-        # 时间设置框架（移到点击设置下面）
-        time_frame = ttk.LabelFrame(main_frame, text="执行时间设置", padding="5")
-        time_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
+        # 定时任务框架（移到点击设置下面）
+        job_frame = ttk.LabelFrame(main_frame, text="定时任务", padding="5")
+        job_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), padx=5, pady=5)
         
-        ttk.Label(time_frame, text="执行时间:").grid(row=0, column=0, padx=5)
+        self.job_listbox = tk.Listbox(job_frame, height=4, width=60)
+        self.job_listbox.grid(row=0, column=0, columnspan=6, sticky=(tk.W, tk.E), pady=2)
+        self.job_listbox.bind('<<ListboxSelect>>', self.on_job_select)
         
-        # 小时选择
-        self.hour_var = tk.StringVar(value=self.scheduled_time.split(':')[0])
-        hour_spinbox = ttk.Spinbox(time_frame, from_=0, to=23, width=5, 
-                                  textvariable=self.hour_var, format="%02.0f")
-        hour_spinbox.grid(row=0, column=1, padx=2)
+        ttk.Label(job_frame, text="名称:").grid(row=1, column=0, padx=5)
+        self.job_name_var = tk.StringVar(value="默认任务")
+        ttk.Entry(job_frame, width=12, textvariable=self.job_name_var).grid(row=1, column=1, padx=2)
         
-        ttk.Label(time_frame, text=":").grid(row=0, column=2)
+        # 执行时刻，精确到毫秒
+        ttk.Label(job_frame, text="时间:").grid(row=1, column=2, padx=5)
+        self.job_time_var = tk.StringVar(value="20:00:00.000")
+        ttk.Entry(job_frame, width=14, textvariable=self.job_time_var).grid(row=1, column=3, padx=2)
         
-        # 分钟选择
-        self.minute_var = tk.StringVar(value=self.scheduled_time.split(':')[1])
-        minute_spinbox = ttk.Spinbox(time_frame, from_=0, to=59, width=5,
-                                    textvariable=self.minute_var, format="%02.0f")
-        minute_spinbox.grid(row=0, column=3, padx=2)
+        # 只执行一次的日期，留空表示重复执行
+        ttk.Label(job_frame, text="日期(可空):").grid(row=1, column=4, padx=5)
+        self.job_date_var = tk.StringVar(value="")
+        ttk.Entry(job_frame, width=12, textvariable=self.job_date_var).grid(row=1, column=5, padx=2)
         
-        # 保存按钮
-        ttk.Button(time_frame, text="保存时间设置", 
-                   command=self.save_time_settings).grid(row=0, column=4, padx=5)
+        # 星期重复，全部不选表示每天
+        weekday_frame = ttk.Frame(job_frame)
+        weekday_frame.grid(row=2, column=0, columnspan=6, pady=2)
+        ttk.Label(weekday_frame, text="重复(不选为每天):").pack(side=tk.LEFT)
+        self.weekday_vars = []
+        for name in WEEKDAY_NAMES:
+            var = tk.BooleanVar(value=False)
+            ttk.Checkbutton(weekday_frame, text=name, variable=var).pack(side=tk.LEFT)
+            self.weekday_vars.append(var)
+        
+        # 是否保存当前坐标和点击间隔为任务专用设置
+        self.job_snapshot_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(job_frame, text="使用当前坐标和间隔的副本", 
+                        variable=self.job_snapshot_var).grid(row=3, column=0, columnspan=3, sticky=tk.W)
+        
+        # 保存/删除按钮
+        ttk.Button(job_frame, text="保存任务", 
+                   command=self.save_job).grid(row=3, column=3, padx=5)
+        ttk.Button(job_frame, text="删除任务", 
+                   command=self.delete_job).grid(row=3, column=4, padx=5)
 
     def toggle_recording(self):
         """切换录制状态（开启/关闭录制模式）"""
-        self.recording = True
-        self.status_label.config(text="正在录制坐标... (按F8停止录制)")
-        threading.Thread(target=self.record_coordinates, daemon=True).start()
+        self.recorder.stream_hz = self.engine.record_stream_hz
+        self.recorder.start()
+        self.status_label.config(text="正在录制坐标... (按F9记录，按住连续记录，按F8停止录制)")
     
     def stop_recording(self):
         """停止录制"""
-        self.recording = False
+        self.recorder.stop()
         self.status_label.config(text="录制已停止")
     
-    def record_coordinates(self):
-        """
-        记录坐标
-        在录制模式下通过F9触发，记录当前鼠标坐标
-        包含冷却时间控制，防止重复记录
-        """
-        while self.recording:
-            if keyboard.is_pressed('F8'):  # 使用F8键停止录制
-                self.stop_recording()
-                break
-            elif keyboard.is_pressed('F9'):  # 使用F9键记录坐标
-                x, y = pyautogui.position()
-                    # 检查该坐标是否已存在
-                if (x, y) not in self.coordinates:
-                    self.coordinates.append((x, y))
-                    self.root.after(0, self.update_listbox)
-                time.sleep(0.3)  # 防止重复记录
-            time.sleep(0.1)
-    
-    def update_listbox(self):
-        """更新坐标列表显示"""
-        self.coordinate_listbox.delete(0, tk.END)
-        for i, (x, y) in enumerate(self.coordinates):
-            self.coordinate_listbox.insert(tk.END, f"坐标 {i+1}: ({x}, {y})")
+    def apply_coordinate_change(self, changes):
+        """按坐标存储的修改通知增量更新坐标列表"""
+        self.coordinate_list.apply_changes(changes)
     
     def delete_selected(self):
-        """清除所选坐标"""
-        selection = self.coordinate_listbox.curselection()
+        """清除所选坐标（支持多选和范围选择）"""
+        selection = self.coordinate_list.curselection()
         if selection:
-            index = selection[0]
-            del self.coordinates[index]
-            self.update_listbox()
+            self.engine.delete_coordinates(selection)
     
     def clear_coordinates(self):
-        """清空所有已记录的坐标，并更新显示和文件"""
-        self.coordinates = []
-        self.update_listbox()
-    
-    def save_coordinates(self):
-        """将坐标保存到文件"""
-        try:
-            with open(self.coordinates_file, 'w') as f:
-                json.dump(self.coordinates, f)
-        except Exception as e:
-            print(f"保存坐标失败: {str(e)}")
-    
-    def load_coordinates(self):
-        """从文件加载保存的坐标"""
-        try:
-            if os.path.exists(self.coordinates_file):
-                with open(self.coordinates_file, 'r') as f:
-                    self.coordinates = json.load(f)
-                self.update_listbox()
-        except Exception as e:
-            print(f"加载坐标失败: {str(e)}")
+        """清空所有已记录的坐标，并更新显示"""
+        self.engine.clear_coordinates()
     
     def start_clicking(self):
-        """开始执行点击任务，创建点击线程"""
-        if not self.coordinates:
+        """开始执行点击任务"""
+        if not self.engine.start_clicking():
             messagebox.showwarning("警告", "没有记录的坐标！")
-            return
-                
-        self.is_running = True
+
+    def show_running_state(self):
+        """切换到执行中的界面状态"""
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
         self.status_label.config(text="正在执行点击...")
-        
-        threading.Thread(target=self.clicking_thread, daemon=True).start()
     
     def stop_clicking(self):
         """停止点击任务"""
-        self.is_running = False
-        self.start_button.config(state=tk.NORMAL)
-        self.stop_button.config(state=tk.DISABLED)
-        self.status_label.config(text="已停止执行")
-    
-    def clicking_thread(self):
-        """
-        点击执行线程
-        根据CPU核心数分组执行点击
-        每组坐标由独立线程处理
-        """
-        import multiprocessing
-        total_cores = multiprocessing.cpu_count()
-        available_cores = max(1, total_cores/2 - 1)  # 预留2个核心，至少保留1个核心
-        print(f"总CPU核心数: {total_cores}, 用于点击的核心数: {available_cores}")
-        
-        while self.is_running:
-            try:
-                # 计算每组大小：向上取整确保所有坐标都被分配
-                total_coords = len(self.coordinates)
-                coords_per_group = -(-total_coords // available_cores)  # 向上取整除法
-                
-                # 将坐标分组
-                groups = []
-                current_group = []
-                for i, (x, y) in enumerate(self.coordinates):
-                    current_group.append((i, x, y))
-                    if len(current_group) == coords_per_group:
-                        groups.append(current_group)
-                        current_group = []
-                if current_group:  # 处理剩余的坐标
-                    groups.append(current_group)
-                
-                # 创建每组的点击函数
-                def click_group(group):
-                    for index, x, y in group:
-                        pyautogui.doubleClick(x, y)
-                        time.sleep(0.01)  # 组内点击间隔极短
-                        pyautogui.doubleClick(x, y)  # 再次双击确保成功
-                        print(f"双击坐标 {index+1}: ({x}, {y})")
-                
-                # 为每组创建线程
-                threads = []
-                for i, group in enumerate(groups):
-                    t = threading.Thread(
-                        target=lambda g=group: click_group(g),
-                        daemon=True,
-                        name=f"Group-{i+1}"
-                    )
-                    threads.append(t)
-                
-                # 同时启动所有组
-                print(f"\n开始执行 {len(groups)} 组点击，每组约 {coords_per_group} 个坐标")
-                for t in threads:
-                    t.start()
-                
-                # 等待所有组完成
-                for t in threads:
-                    t.join(timeout=1.0)
-                
-                print(f"完成一轮点击\n")
-                
-                # 等待设定的间隔后进行下一轮
-                time.sleep(self.click_interval)
-                
-            except Exception as e:
-                print(f"点击执行出错: {str(e)}")
-                time.sleep(0.1)
-        
-        print("点击线程结束")
-    
+        self.engine.stop_clicking()  # 界面由 RUN_STOPPED 事件更新
+
     def emergency_stop(self):
         """紧急停止所有操作（ESC键触发）"""
-        if self.is_running:
-            self.is_running = False
-            self.root.after(0, self.update_after_stop)
+        self.engine.stop_clicking()
 
     def update_after_stop(self):
         """更新UI状态"""
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         
-        current_time = self.get_network_time()
-        next_run = datetime.strptime(f"{current_time.date()} 20:00:00", "%Y-%m-%d %H:%M:%S")
-        if current_time.time() >= datetime.strptime("20:00:00", "%H:%M:%S").time():
-            next_run = next_run + timedelta(days=1)
-        
         self.status_label.config(
-            text=f"已停止执行 (按Esc键可随时停止)\n下次执行时间: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
+            text=f"已停止执行 (按Esc键可随时停止)\n{self.engine.format_status()}")
     
     def on_closing(self):
         """窗口关闭时的清理操作"""
         self.stop_time_update()  # 停止时间更新
-        self.save_coordinates()
+        self.recorder.stop()
+        self.engine.close()
         self.root.destroy()
 
-    def save_time_settings(self):
-        """保存时间设置"""
-        try:
-            hour = int(self.hour_var.get())
-            minute = int(self.minute_var.get())
-            
-            if 0 <= hour <= 23 and 0 <= minute <= 59:
-                self.scheduled_time = f"{hour:02d}:{minute:02d}"
-                self.save_settings()
-                messagebox.showinfo("成功", f"执行时间已设置为 {self.scheduled_time}")
-            else:
-                messagebox.showerror("错误", "请输入有效的时间")
-        except ValueError:
-            messagebox.showerror("错误", "请输入有效的数字")
+    def update_job_listbox(self):
+        """更新定时任务列表显示"""
+        self.job_listbox.delete(0, tk.END)
+        for job in self.engine.scheduler.jobs.values():
+            coords = f"{len(job.coordinates)}个专用坐标" if job.coordinates is not None else "当前坐标"
+            self.job_listbox.insert(tk.END, f"{job.name}  {job.time_of_day}  {job.describe_recurrence()}  ({coords})")
 
-    def save_settings(self):
-        """保存程序设置到文件"""
-        try:
-            settings = {
-                'scheduled_time': self.scheduled_time,
-                'click_interval': self.click_interval
-            }
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f)
-        except Exception as e:
-            print(f"保存设置失败: {str(e)}")
+    def on_job_select(self, event=None):
+        """选中任务时把设置填入编辑框"""
+        selection = self.job_listbox.curselection()
+        if not selection:
+            return
+        job = list(self.engine.scheduler.jobs.values())[selection[0]]
+        self.job_name_var.set(job.name)
+        self.job_time_var.set(job.time_of_day)
+        self.job_date_var.set(job.date.strftime("%Y-%m-%d") if job.date else "")
+        for i, var in enumerate(self.weekday_vars):
+            var.set(i in job.weekdays)
+        self.job_snapshot_var.set(job.coordinates is not None)
 
-    def load_settings(self):
-        """从文件加载程序设置"""
+    def save_job(self):
+        """保存（新增或修改）定时任务"""
+        name = self.job_name_var.get().strip()
+        if not name:
+            messagebox.showerror("错误", "请输入任务名称")
+            return
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    settings = json.load(f)
-                    self.scheduled_time = settings.get('scheduled_time', "20:00")
-                    self.click_interval = settings.get('click_interval', 0.1)
-        except Exception as e:
-            print(f"加载设置失败: {str(e)}")
-            self.scheduled_time = "20:00"
-            self.click_interval = 0.1
+            snapshot = self.job_snapshot_var.get()
+            job = Job(
+                name,
+                self.job_time_var.get(),
+                date=self.job_date_var.get().strip() or None,
+                weekdays=[i for i, var in enumerate(self.weekday_vars) if var.get()],
+                coordinates=list(self.engine.coordinates) if snapshot else None,
+                click_interval=self.engine.click_interval if snapshot else None
+            )
+        except ValueError as e:
+            messagebox.showerror("错误", f"请输入有效的时间: {str(e)}")
+            return
+        self.engine.save_job(job)
+        messagebox.showinfo("成功", f"任务 {job.name} 已设置为 {job.describe_recurrence()} {job.time_of_day}")
+
+    def delete_job(self):
+        """删除选中的定时任务"""
+        selection = self.job_listbox.curselection()
+        if selection:
+            job = list(self.engine.scheduler.jobs.values())[selection[0]]
+            self.engine.delete_job(job.name)
 
     def save_click_settings(self):
         """保存点击频率设置"""
         try:
             interval_ms = int(self.interval_var.get())
             if 1 <= interval_ms <= 1000:
-                self.click_interval = interval_ms / 1000  # 转换为秒
-                self.save_settings()
+                self.engine.set_click_interval(interval_ms / 1000)  # 转换为秒
                 messagebox.showinfo("成功", f"点击间隔已设置为 {interval_ms} 毫秒")
             else:
                 messagebox.showerror("错误", "请输入1-1000之间的数值")
@@ -518,34 +303,18 @@ class AutoClickerGUI:
             messagebox.showerror("错误", "请输入有效的数字")
 
     def start_time_update(self):
-        """启动时间更新，定期更新显示的时间"""
+        """启动状态显示刷新，按 display_refresh_ms 的间隔更新显示的时间"""
         def update_display():
             try:
-                # 获取网络时间
-                current_time = self.get_network_time()
-                current_ms = int(time.time() * 1000) % 1000
-                
-                # 计算下次执行时间
-                next_run = datetime.strptime(
-                    f"{current_time.date()} {self.scheduled_time}:00", 
-                    "%Y-%m-%d %H:%M:%S"
-                )
-                if current_time.time() >= datetime.strptime(f"{self.scheduled_time}:00", "%H:%M:%S").time():
-                    next_run = next_run + timedelta(days=1)
-                
-                # 更新显示
-                status_text = f"当前网络时间: {current_time.strftime('%Y-%m-%d %H:%M:%S')}.{current_ms:03d}\n"
-                status_text += f"下次执行时间: {next_run.strftime('%Y-%m-%d %H:%M:%S')}.000"
-                
-                self.status_label.config(text=status_text)
+                self.status_label.config(text=self.engine.format_status())
                 
             except Exception as e:
-                print(f"时间更新出错: {str(e)}")
+                log.error("时间更新出错", error=str(e))
             
             finally:
                 # 确保下一次更新被调度
                 if self.update_timer is not None:
-                    self.update_timer = self.root.after(1000, update_display)  # 每秒更新一次
+                    self.update_timer = self.root.after(self.engine.display_refresh_ms, update_display)
         
         # 开始第一次更新
         self.update_timer = self.root.after(0, update_display)
@@ -564,4 +333,5 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()   # 打包后的程序中，多进程执行器的工作进程在这里进入工作函数而不是再次运行主程序
     main()
@@ -0,0 +1,555 @@
+import http.client
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from event_log import log
+from display_zone import DisplayZone
+from http_date import parse_http_date
+from sntp import SntpConnection, is_ntp_url
+
+# 默认时间服务器：ntp:// 为SNTP服务器，优先使用；
+# http(s):// 读取HTTP响应头中的Date字段，只在所有SNTP服务器都不可用（如UDP 123端口被封）时使用
+DEFAULT_SERVERS = [
+    'ntp://ntp.aliyun.com',
+    'ntp://ntp.tencent.com',
+    'ntp://cn.pool.ntp.org',
+    'https://www.baidu.com',
+    'https://www.taobao.com',
+    'https://www.jd.com'
+]
+
+MAX_DRIFT_PPM = 500                   # 漂移估计上限（百万分之一）
+DRIFT_UNCERTAINTY_PPM = 50            # 尚未估计漂移时假设的本地时钟频率误差
+FITTED_DRIFT_UNCERTAINTY_PPM = 5      # 已拟合漂移后剩余的频率误差
+SECOND_US = 1_000_000
+MAX_STATE_AGE_S = 7 * 24 * 3600       # 保存的时钟状态超过该时长后不再使用
+MAX_RESTORED_ERROR_US = SECOND_US     # 老化后误差界超过该值的时钟状态没有参考价值
+
+SYNC_MODES = ('fast', 'bracket')      # fast: 单次请求; bracket: 秒边界夹逼
+
+HEALTH_DECAY = 0.7                    # 健康分指数平滑系数
+HEALTH_MIN = 0.3                      # 低于该分数的服务器暂时移出轮换
+PROBATION_ROUNDS = 10                 # 被移出的服务器每隔多少轮重新试探一次
+
+
+class TimeServerConnection:
+    """
+    到单个时间服务器的持久连接
+    TCP/TLS握手在计时之外完成，之后用HEAD请求在已建立的长连接上读取Date头，
+    测得的往返时延只包含一次请求应答
+    """
+
+    HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Connection': 'keep-alive'
+    }
+
+    def __init__(self, url, timeout=2):
+        parts = urlsplit(url)
+        self.url = url
+        self.https = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/'
+        self.timeout = timeout
+        self.conn = None
+        self.lock = threading.Lock()      # 同一连接上的请求必须串行
+        self._ssl_context = ssl.create_default_context() if self.https else None
+
+    def connect(self):
+        """建立连接（含TLS握手），不计入往返时延"""
+        self.close()
+        if self.https:
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                               context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        conn.connect()
+        self.conn = conn
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _request(self, clock):
+        t0 = clock()
+        self.conn.request('HEAD', self.path, headers=self.HEADERS)
+        response = self.conn.getresponse()
+        t1 = clock()
+        response.read()
+        if response.will_close:
+            self.close()
+        return t0, t1, response.getheader('Date')
+
+    def head(self, clock):
+        """
+        发送一次HEAD请求
+        Args:
+            clock: 返回本地时间戳的函数
+        Returns:
+            (发送时间, 接收时间, Date头)
+        """
+        with self.lock:
+            if self.conn is None:
+                self.connect()
+                return self._request(clock)
+            try:
+                return self._request(clock)
+            except (http.client.HTTPException, OSError):
+                # 服务器已关闭空闲连接：重连后重新计时
+                self.connect()
+                return self._request(clock)
+
+
+def marzullo(intervals):
+    """
+    Marzullo算法：求被最多区间同时覆盖的最小范围
+    Args:
+        intervals: [(lo, hi), ...]
+    Returns:
+        (覆盖数量, lo, hi)
+    """
+    edges = []
+    for lo, hi in intervals:
+        edges.append((lo, 0))     # 0: 区间开始，同值时排在结束之前
+        edges.append((hi, 1))
+    edges.sort()
+
+    best, count = 0, 0
+    best_lo = best_hi = None
+    for i, (value, kind) in enumerate(edges):
+        if kind == 0:
+            count += 1
+            if count > best:
+                best = count
+                best_lo = value
+                best_hi = edges[i + 1][0]
+        else:
+            count -= 1
+    return best, best_lo, best_hi
+
+
+class ClockSync:
+    """
+    网络时钟同步器
+    后台采样时间服务器（SNTP优先，HTTP Date作为后备），维护相对于 time.perf_counter() 的偏移和漂移估计，
+    调用方通过 now_us()/now() 读取"网络时间"，读取过程不做任何网络I/O
+    """
+
+    def __init__(self, servers=None, window=16, timeout=2, mode='fast',
+                 bracket_probes=12, bracket_target_us=4000, samples_per_server=4, zone=None):
+        """
+        Args:
+            servers: 时间服务器URL列表（ntp://主机[:端口] 或 http(s)://主机）
+            window: 参与滤波的最近样本数量
+            timeout: 单次请求超时时间(秒)
+            mode: HTTP服务器的同步模式，'fast' 或 'bracket'
+            bracket_probes: 夹逼模式下单个服务器的最大探测次数
+            bracket_target_us: 夹逼模式下期望达到的偏移区间宽度(微秒)
+            samples_per_server: fast模式和SNTP每轮对单个服务器的采样次数
+            zone: 显示和输入执行时刻所用的 DisplayZone，默认北京时间
+        """
+        if mode not in SYNC_MODES:
+            raise ValueError(f"未知的同步模式: {mode}")
+        self.window = window
+        self.timeout = timeout
+        self.mode = mode
+        self.bracket_probes = bracket_probes
+        self.bracket_target_us = bracket_target_us
+        self.samples_per_server = samples_per_server
+        self.zone = zone or DisplayZone()
+
+        self._round = 0
+        self._connections = {}
+        self._executor = None
+        self.set_servers(servers or DEFAULT_SERVERS)
+
+        # 本地时间基准：启动时的系统时间 + perf_counter 单调增量
+        self._base_epoch_us = int(time.time() * 1_000_000)
+        self._base_perf = time.perf_counter()
+
+        # 时钟模型 (参考点本地时间us, 参考点偏移us, 漂移率, 偏移误差界us)，整体替换保证读取无锁
+        self._model = (self._base_epoch_us, 0.0, 0.0, None)
+        self._samples = []                # [(本地中点us, 偏移us, 往返时延us, 误差界us), ...]
+        self._lock = threading.Lock()     # 仅保护样本更新
+        self.synced = False               # 是否已获得至少一个有效样本
+        self.drift_fitted = False         # 漂移是否已由样本拟合
+        self.last_sync_local_us = None    # 最近一次成功采样的本地时间
+        self.last_rtt_us = None           # 最近一次成功采样的往返时延
+        self.rtt_stats = {}               # 服务器 -> (往返时延平滑值us, 最小往返时延us, 成功次数)
+        self.warm_started = False         # 时钟模型是否来自上次运行保存的状态
+        self._prior_drift = 0.0           # 上次运行估计的漂移率，样本不足以拟合时沿用
+
+    def set_servers(self, servers):
+        """更换时间服务器列表（关闭旧连接，健康分重新开始计算）"""
+        old_connections = self._connections
+        old_executor = self._executor
+        self.servers = list(servers)
+        # 服务器健康分 (0~1)，持续出错或与多数服务器不一致时下降
+        self.health = {server: 1.0 for server in self.servers}
+        self._connections = {
+            server: (SntpConnection if is_ntp_url(server) else TimeServerConnection)(server, self.timeout)
+            for server in self.servers
+        }
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(self.servers)),
+                                            thread_name_prefix="ClockSync")
+        for conn in old_connections.values():
+            with conn.lock:
+                conn.close()
+        if old_executor is not None:
+            old_executor.shutdown(wait=False)
+
+    def local_us(self):
+        """单调的本地时间（微秒，Unix纪元）"""
+        return self._base_epoch_us + int((time.perf_counter() - self._base_perf) * 1_000_000)
+
+    def now_us(self):
+        """当前网络时间（微秒，Unix纪元，UTC），不做网络I/O"""
+        local = self.local_us()
+        ref_local, ref_offset, drift, _ = self._model
+        return local + int(ref_offset + drift * (local - ref_local))
+
+    def now(self):
+        """当前网络时间（显示时区的墙上时间，datetime）"""
+        return self.zone.from_us(self.now_us())
+
+    def from_us(self, us):
+        """网络时间微秒转换为显示时区的datetime"""
+        return self.zone.from_us(us)
+
+    def to_us(self, dt):
+        """显示时区的datetime转换为网络时间微秒（from_us()的逆运算）"""
+        return self.zone.to_us(dt)
+
+    def offset_us(self):
+        """当前估计的网络时间与本地时间之差（微秒）"""
+        local = self.local_us()
+        ref_local, ref_offset, drift, _ = self._model
+        return ref_offset + drift * (local - ref_local)
+
+    def error_us(self):
+        """当前偏移估计的误差界（微秒），尚未同步时为None"""
+        return self._model[3]
+
+    def predicted_error_us(self, at_us=None):
+        """
+        预计在网络时间 at_us（默认现在）时的偏移误差界
+        样本误差界加上自参考样本以来的时间乘以频率误差，尚未同步时为None
+        """
+        ref_local, ref_offset, _, error = self._model
+        if error is None:
+            return None
+        if at_us is None:
+            at_us = self.now_us()
+        ppm = FITTED_DRIFT_UNCERTAINTY_PPM if self.drift_fitted else DRIFT_UNCERTAINTY_PPM
+        return error + abs(at_us - ref_offset - ref_local) * ppm / 1_000_000
+
+    def drift_ppm(self):
+        """当前估计的本地时钟漂移率（ppm）"""
+        return self._model[2] * 1_000_000
+
+    def sync_age_s(self):
+        """距最近一次成功同步的秒数，尚未同步时为None"""
+        if self.last_sync_local_us is None:
+            return None
+        return (self.local_us() - self.last_sync_local_us) / 1_000_000
+
+    def probe(self, server):
+        """
+        向单个服务器请求一次Date头
+        Returns:
+            (发送时本地us, 接收时本地us, 服务器Date秒对应的us)
+        """
+        t0, t1, date = self._connections[server].head(self.local_us)
+        if not date:
+            raise Exception("响应中没有Date头")
+
+        return t0, t1, parse_http_date(date)
+
+    @staticmethod
+    def offset_bounds(t0, t1, date_us):
+        """
+        单次探测对偏移的约束
+        服务器在本地[t0, t1]内某时刻生成Date，且真实时间落在[date, date+1s)，
+        因此 date - t1 <= 偏移 < date + 1s - t0
+        """
+        return date_us - t1, date_us + SECOND_US - t0
+
+    def sample_server(self, server):
+        """
+        向单个服务器连续采样多次（fast模式）
+        各次探测的偏移区间取交集；若出现矛盾则只保留往返时延最小的那次
+        Returns:
+            (本地中点us, 偏移us, 最小往返时延us, 误差界us)
+        """
+        probes = []
+        for _ in range(self.samples_per_server):
+            t0, t1, date_us = self.probe(server)
+            probes.append((t1 - t0, t0, self.offset_bounds(t0, t1, date_us)))
+
+        min_rtt, t0, (lo, hi) = min(probes)
+        mid = t0 + min_rtt // 2
+        all_lo = max(p[2][0] for p in probes)
+        all_hi = min(p[2][1] for p in probes)
+        if all_lo < all_hi:
+            lo, hi = all_lo, all_hi
+        return mid, (lo + hi) / 2, min_rtt, (hi - lo) / 2
+
+    def ntp_server(self, server):
+        """
+        SNTP采样：连续查询多次，取往返时延最小的一次
+        Returns:
+            (本地中点us, 偏移us, 往返时延us, 误差界us)
+        """
+        return self._connections[server].sample(self.local_us, self.samples_per_server)
+
+    def bracket_server(self, server):
+        """
+        秒边界夹逼采样（bracket模式）
+        反复在预测的服务器秒翻转时刻附近探测，每次探测结果落在翻转前或翻转后，
+        都会把偏移区间的一侧收紧，类似二分查找，最终区间宽度接近往返时延
+        Returns:
+            (本地中点us, 偏移us, 最小往返时延us, 误差界us)
+        """
+        t0, t1, date_us = self.probe(server)
+        lo, hi = self.offset_bounds(t0, t1, date_us)
+        min_rtt = t1 - t0
+        stale = 0
+
+        for _ in range(self.bracket_probes - 1):
+            if hi - lo <= self.bracket_target_us or stale >= 3:
+                break
+
+            # 以区间中点为假设，计算下一次服务器秒翻转对应的本地时刻
+            guess = (lo + hi) / 2
+            now = self.local_us()
+            boundary = ((now + guess) // SECOND_US + 1) * SECOND_US - guess
+            send_at = boundary - min_rtt / 2
+            if send_at - now < 0.05 * SECOND_US:
+                send_at += SECOND_US
+            time.sleep((send_at - now) / SECOND_US)
+
+            t0, t1, date_us = self.probe(server)
+            p_lo, p_hi = self.offset_bounds(t0, t1, date_us)
+            min_rtt = min(min_rtt, t1 - t0)
+            new_lo, new_hi = max(lo, p_lo), min(hi, p_hi)
+            if new_lo >= new_hi:
+                # 约束矛盾（服务器时钟跳变或缓存的Date），以本次探测为准重新开始
+                new_lo, new_hi = p_lo, p_hi
+            stale = stale + 1 if new_hi - new_lo >= hi - lo else 0
+            lo, hi = new_lo, new_hi
+
+        mid = self.local_us()
+        return mid, (lo + hi) / 2, min_rtt, (hi - lo) / 2
+
+    def warm_up(self):
+        """预先并发建立到所有服务器的连接，使首轮采样不包含握手时间"""
+        for server, conn in self._connections.items():
+            self._executor.submit(self._warm_connection, conn)
+
+    @staticmethod
+    def _warm_connection(conn):
+        try:
+            with conn.lock:
+                if conn.conn is None:
+                    conn.connect()
+        except Exception as e:
+            log.warning("连接时间服务器失败", server=conn.url, error=str(e))
+
+    def close(self):
+        """关闭所有服务器连接"""
+        for conn in self._connections.values():
+            with conn.lock:
+                conn.close()
+
+    def active_servers(self):
+        """本轮参与采样的服务器：健康分达标的，加上处于试探轮次的低分服务器"""
+        self._round += 1
+        probation = self._round % PROBATION_ROUNDS == 0
+        active = [s for s in self.servers if self.health[s] >= HEALTH_MIN or probation]
+        return active or list(self.servers)
+
+    def _update_health(self, server, good):
+        self.health[server] = HEALTH_DECAY * self.health[server] + (1 - HEALTH_DECAY) * (1.0 if good else 0.0)
+
+    def _sample_all(self, servers, sampler):
+        """
+        并发采样一组服务器，返回 {服务器: 样本}，失败的服务器降低健康分
+        SNTP服务器首次查询超时多半是UDP被封，立即移出轮换，只在试探轮次重试，
+        避免之后每轮都白等一次超时
+        """
+        futures = {server: self._executor.submit(sampler, server) for server in servers}
+        results = {}
+        for server, future in futures.items():
+            try:
+                results[server] = future.result()
+            except Exception as e:
+                if isinstance(e, socket.timeout) and is_ntp_url(server):
+                    self.health[server] = 0.0
+                else:
+                    self._update_health(server, False)
+                log.warning("从服务器获取时间失败", server=server, error=str(e))
+        return results
+
+    def sync_once(self):
+        """
+        并发采样所有活跃的SNTP服务器，全部失败时改为采样HTTP服务器，
+        用Marzullo算法合并各服务器的偏移区间
+        与多数服务器区间不相交的服务器视为时钟异常，降低其健康分
+        """
+        servers = self.active_servers()
+        ntp_servers = [s for s in servers if is_ntp_url(s)]
+        http_servers = [s for s in servers if not is_ntp_url(s)]
+        results = self._sample_all(ntp_servers, self.ntp_server) if ntp_servers else {}
+        if not results and http_servers:
+            if ntp_servers:
+                log.warning("SNTP服务器均不可用，改用HTTP时间服务器")
+            sampler = self.bracket_server if self.mode == 'bracket' else self.sample_server
+            results = self._sample_all(http_servers, sampler)
+
+        if not results:
+            log.warning("所有服务器都失败，继续使用当前时钟模型")
+            return False
+
+        intervals = {server: (r[1] - r[3], r[1] + r[3]) for server, r in results.items()}
+        count, lo, hi = marzullo(intervals.values())
+        if count * 2 <= len(results) and len(results) > 1:
+            # 没有多数一致的区间：取各服务器中点的中位数，误差界覆盖全部分歧
+            mids = sorted(r[1] for r in results.values())
+            median = mids[len(mids) // 2]
+            spread = max(abs(m - median) for m in mids)
+            lo = median - spread - min(r[3] for r in results.values())
+            hi = median + spread + min(r[3] for r in results.values())
+            log.warning("服务器时间不一致，取中位数", median_ms=round(median / 1000, 1))
+        else:
+            for server, (s_lo, s_hi) in intervals.items():
+                self._update_health(server, s_lo <= hi and s_hi >= lo)
+
+        for server, r in results.items():
+            self._update_rtt(server, r[2])
+        mid = max(r[0] for r in results.values())
+        rtt = min(r[2] for r in results.values())
+        self.add_sample(mid, (lo + hi) / 2, rtt, (hi - lo) / 2)
+        for server, r in results.items():
+            log.debug("服务器采样", server=server, offset_ms=round(r[1] / 1000, 1),
+                      error_ms=round(r[3] / 1000, 1), delay_ms=round(r[2] / 2000, 2),
+                      health=round(self.health[server], 2))
+        log.info("时间同步成功", agree=f"{count}/{len(results)}", offset_ms=round((lo + hi) / 2000, 1),
+                 error_ms=round((hi - lo) / 2000, 1))
+        return True
+
+    def _update_rtt(self, server, rtt_us):
+        smoothed, minimum, count = self.rtt_stats.get(server, (rtt_us, rtt_us, 0))
+        self.rtt_stats[server] = (HEALTH_DECAY * smoothed + (1 - HEALTH_DECAY) * rtt_us,
+                                  min(minimum, rtt_us), count + 1)
+
+    def add_sample(self, local_mid_us, offset_us, rtt_us, error_us):
+        """加入一个样本并重新估计偏移和漂移"""
+        with self._lock:
+            self._samples.append((local_mid_us, offset_us, rtt_us, error_us))
+            del self._samples[:-self.window]
+            self._model = self._estimate(self._samples)
+            self.drift_fitted = self._model[2] != 0.0
+            self.synced = True
+            self.last_sync_local_us = local_mid_us
+            self.last_rtt_us = rtt_us
+
+    def _estimate(self, samples):
+        """
+        由样本估计时钟模型
+        偏移取老化后误差界最小的样本：误差界加上到最新样本的时间乘以频率误差（与 predicted_error_us() 相同），
+        旧样本误差界再小也会被新样本取代；同等时取往返时延最小的样本。
+        漂移对误差界不超过最小值两倍的样本做最小二乘拟合，样本不足时沿用上次运行的估计
+        """
+        latest = max(s[0] for s in samples)
+        ppm = FITTED_DRIFT_UNCERTAINTY_PPM if self.drift_fitted else DRIFT_UNCERTAINTY_PPM
+        best = min(samples, key=lambda s: (s[3] + (latest - s[0]) * ppm / 1_000_000, s[2]))
+        tightest = min(s[3] for s in samples)
+        good = [s for s in samples if s[3] <= 2 * tightest + 1000]
+
+        drift = self._prior_drift
+        if len(good) >= 3:
+            n = len(good)
+            mean_t = sum(s[0] for s in good) / n
+            mean_o = sum(s[1] for s in good) / n
+            var_t = sum((s[0] - mean_t) ** 2 for s in good)
+            # 时间跨度太短时漂移不可观测
+            if var_t > 0 and good[-1][0] - good[0][0] >= 60_000_000:
+                cov = sum((s[0] - mean_t) * (s[1] - mean_o) for s in good)
+                drift = cov / var_t
+                limit = MAX_DRIFT_PPM / 1_000_000
+                drift = max(-limit, min(limit, drift))
+
+        return best[0], float(best[1]), drift, best[3]
+
+    def export_state(self):
+        """
+        导出可以跨进程保存的时钟状态
+        perf_counter 在每次启动时重新计数，因此偏移和同步时刻都换算为相对系统时间（Unix纪元us）
+        Returns:
+            dict，尚未同步过时返回None
+        """
+        error = self.predicted_error_us()
+        if error is None:
+            return None
+        system_us = time.time() * 1_000_000
+        to_system = system_us - self.local_us()
+        return {
+            'saved_at_us': int(system_us),
+            'offset_us': self.offset_us() - to_system,
+            'drift_ppm': self.drift_ppm(),
+            'drift_fitted': self.drift_fitted,
+            'error_us': error,
+            'last_sync_us': int(self.last_sync_local_us + to_system) if self.last_sync_local_us else None,
+            'servers': {
+                server: {'health': self.health[server],
+                         'rtt_us': self.rtt_stats[server][0] if server in self.rtt_stats else None,
+                         'min_rtt_us': self.rtt_stats[server][1] if server in self.rtt_stats else None,
+                         'samples': self.rtt_stats[server][2] if server in self.rtt_stats else 0}
+                for server in self.servers
+            }
+        }
+
+    def restore_state(self, state):
+        """
+        用上次运行保存的状态初始化时钟模型
+        偏移按保存的漂移率外推到现在，误差界按 predicted_error_us() 相同的频率误差随保存时长增长；
+        恢复的模型作为一个样本参与估计，之后误差更小的真实样本会取代它。
+        synced 仍为False，同步计划会尽快采集本次运行的第一个样本
+        Returns:
+            是否已恢复（状态过旧或误差过大时忽略）
+        """
+        system_us = time.time() * 1_000_000
+        age_us = system_us - state['saved_at_us']
+        if not 0 <= age_us <= MAX_STATE_AGE_S * SECOND_US:
+            return False
+        drift = max(-MAX_DRIFT_PPM, min(MAX_DRIFT_PPM, state.get('drift_ppm', 0.0))) / 1_000_000
+        fitted = state.get('drift_fitted', False)
+        ppm = FITTED_DRIFT_UNCERTAINTY_PPM if fitted else DRIFT_UNCERTAINTY_PPM
+        error = state['error_us'] + age_us * ppm / 1_000_000
+        if error > MAX_RESTORED_ERROR_US:
+            return False
+
+        local = self.local_us()
+        to_system = system_us - local
+        offset = state['offset_us'] + drift * age_us + to_system
+        for server, stats in state.get('servers', {}).items():
+            if server in self.health:
+                self.health[server] = stats.get('health', 1.0)
+                if stats.get('samples'):
+                    self.rtt_stats[server] = (stats['rtt_us'], stats['min_rtt_us'], stats['samples'])
+        with self._lock:
+            self._prior_drift = drift if fitted else 0.0
+            self._samples = [(local, offset, 0, error)]
+            self._model = self._estimate(self._samples)
+            self.drift_fitted = fitted
+            self.last_sync_local_us = (state.get('last_sync_us') or state['saved_at_us']) - to_system
+        self.warm_started = True
+        log.info("已恢复上次的时钟状态", offset_ms=round(offset / 1000, 1), error_ms=round(error / 1000, 1),
+                 age_s=round(age_us / SECOND_US))
+        return True
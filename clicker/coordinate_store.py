@@ -0,0 +1,225 @@
+import threading
+from array import array
+
+
+class CoordinateStore:
+    """
+    坐标存储
+    坐标按顺序保存在两个整数数组中，另有计数字典和网格索引用于O(1)查重：
+    tolerance 为0时只合并完全相同的坐标，大于0时与已有坐标的横纵距离都不超过 tolerance 的新坐标视为重复。
+    每次操作通过 on_change([(序号, 删除数量, 插入的坐标列表), ...]) 通知一次，各段修改按顺序应用，
+    界面只需更新变化的行
+    """
+
+    def __init__(self, points=(), tolerance=0):
+        """
+        Args:
+            points: 初始坐标 [(x, y), ...]，不做查重
+            tolerance: 近似重复的合并距离(像素)
+        """
+        self.xs = array('i')
+        self.ys = array('i')
+        self._counts = {}       # (x, y) -> 出现次数（旧文件中可能已有重复坐标）
+        self._cells = {}        # 网格索引：(x // 格宽, y // 格宽) -> {(x, y), ...}
+        self._lock = threading.RLock()
+        self.tolerance = tolerance
+        self.version = 0        # 每次修改加1
+        self.on_change = None
+        self._load(points)
+
+    @property
+    def tolerance(self):
+        return self._tolerance
+
+    @tolerance.setter
+    def tolerance(self, value):
+        with self._lock:
+            self._tolerance = max(0, int(value))
+            self._cell_size = self._tolerance + 1
+            self._cells = {}
+            for point in self._counts:
+                self._cells.setdefault(self._cell(point), set()).add(point)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        with self._lock:
+            if isinstance(index, slice):
+                return list(zip(self.xs[index], self.ys[index]))
+            return self.xs[index], self.ys[index]
+
+    def __contains__(self, point):
+        return tuple(point) in self._counts
+
+    def to_list(self):
+        """全部坐标 [(x, y), ...]"""
+        with self._lock:
+            return list(zip(self.xs, self.ys))
+
+    def _cell(self, point):
+        return point[0] // self._cell_size, point[1] // self._cell_size
+
+    def find_near(self, x, y):
+        """
+        查找与 (x, y) 重复或在合并距离内的已有坐标
+        Returns:
+            已有坐标，不存在时返回None
+        """
+        if (x, y) in self._counts:
+            return x, y
+        if not self._tolerance:
+            return None
+        cx, cy = self._cell((x, y))
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for px, py in self._cells.get((cx + dx, cy + dy), ()):
+                    if abs(px - x) <= self._tolerance and abs(py - y) <= self._tolerance:
+                        return px, py
+        return None
+
+    def _index_add(self, point):
+        count = self._counts.get(point, 0)
+        self._counts[point] = count + 1
+        if not count:
+            self._cells.setdefault(self._cell(point), set()).add(point)
+
+    def _index_remove(self, point):
+        count = self._counts[point] - 1
+        if count:
+            self._counts[point] = count
+            return
+        del self._counts[point]
+        cell = self._cell(point)
+        self._cells[cell].discard(point)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def _load(self, points):
+        for x, y in points:
+            self.xs.append(x)
+            self.ys.append(y)
+            self._index_add((x, y))
+
+    def _changed(self, changes):
+        self.version += 1
+        if self.on_change is not None:
+            self.on_change(changes)
+
+    def add(self, x, y):
+        """
+        追加一个坐标，重复或在合并距离内时不添加
+        Returns:
+            是否添加
+        """
+        return self.extend([(x, y)]) == 1
+
+    def extend(self, points):
+        """
+        批量追加坐标，跳过重复和近似重复（包括本批内部的重复）
+        Returns:
+            实际添加的数量
+        """
+        return self.insert(len(self), points)
+
+    def insert(self, index, points):
+        """
+        在指定位置批量插入坐标，跳过重复和近似重复
+        Returns:
+            实际插入的数量
+        """
+        with self._lock:
+            index = max(0, min(index, len(self)))
+            added = []
+            for x, y in points:
+                point = (int(x), int(y))
+                if self.find_near(*point) is None:
+                    self._index_add(point)
+                    added.append(point)
+            if not added:
+                return 0
+            self.xs[index:index] = array('i', [p[0] for p in added])
+            self.ys[index:index] = array('i', [p[1] for p in added])
+            self._changed([(index, 0, added)])
+            return len(added)
+
+    def delete(self, indices):
+        """
+        批量删除指定序号的坐标，连续的序号合并为一段修改，整批只通知一次
+        Returns:
+            删除的数量
+        """
+        with self._lock:
+            indices = sorted({i for i in indices if 0 <= i < len(self)}, reverse=True)
+            # 从后往前按连续区间删除，前面的序号不受影响
+            runs = []
+            for i in indices:
+                if runs and runs[-1][0] == i + 1:
+                    runs[-1][0] = i
+                else:
+                    runs.append([i, i + 1])
+            for start, stop in runs:
+                for point in zip(self.xs[start:stop], self.ys[start:stop]):
+                    self._index_remove(point)
+                del self.xs[start:stop]
+                del self.ys[start:stop]
+            if runs:
+                self._changed([(start, stop - start, []) for start, stop in runs])
+            return len(indices)
+
+    def delete_range(self, start, stop):
+        """删除序号在 [start, stop) 内的坐标"""
+        return self.delete(range(start, stop))
+
+    def reorder(self, order):
+        """
+        按新顺序重排坐标
+        Args:
+            order: 原序号的一个排列，新列表第 i 个坐标是原来的第 order[i] 个
+        """
+        with self._lock:
+            if sorted(order) != list(range(len(self))):
+                raise ValueError("新顺序必须是全部坐标序号的一个排列")
+            changed = [i for i, j in enumerate(order) if i != j]
+            if not changed:
+                return
+            start, stop = changed[0], changed[-1] + 1
+            self.xs[start:stop] = array('i', [self.xs[j] for j in order[start:stop]])
+            self.ys[start:stop] = array('i', [self.ys[j] for j in order[start:stop]])
+            self._changed([(start, stop - start, list(zip(self.xs[start:stop], self.ys[start:stop])))])
+
+    def move(self, indices, target):
+        """
+        把选中的坐标整体移动到 target 位置（按移动前的序号计算）
+        """
+        with self._lock:
+            selected = sorted(set(indices))
+            chosen = set(selected)
+            rest = [i for i in range(len(self)) if i not in chosen]
+            position = sum(1 for i in rest if i < target)
+            self.reorder(rest[:position] + selected + rest[position:])
+
+    def replace(self, points):
+        """整体替换为给定坐标（不做查重，用于加载文件）"""
+        with self._lock:
+            removed = len(self)
+            self.xs = array('i')
+            self.ys = array('i')
+            self._counts = {}
+            self._cells = {}
+            self._load((int(x), int(y)) for x, y in points)
+            self._changed([(0, removed, self.to_list())])
+
+    def clear(self):
+        """删除所有坐标"""
+        with self._lock:
+            removed = len(self)
+            if removed:
+                self.xs = array('i')
+                self.ys = array('i')
+                self._counts = {}
+                self._cells = {}
+                self._changed([(0, removed, [])])
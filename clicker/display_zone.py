@@ -0,0 +1,58 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_US = timedelta(microseconds=1)
+DEFAULT_ZONE = '+08:00'   # 旧版本固定使用北京时间
+
+_OFFSET = re.compile(r'^(?:UTC|GMT)?([+-])(\d{1,2})(?::?(\d{2}))?$')
+
+
+class DisplayZone:
+    """
+    显示和输入执行时刻所用的时区
+    调度统一使用UTC纪元微秒，只有与界面、任务设置中的墙上时间互相换算时才用到时区
+    """
+
+    def __init__(self, spec=DEFAULT_ZONE):
+        """
+        Args:
+            spec: "UTC"、"+08:00" 这样的固定偏移、"local"（系统时区）
+                  或 "Asia/Shanghai" 这样的IANA时区名（需要系统或 tzdata 提供时区数据）
+        Raises:
+            ValueError: 无法识别的时区
+        """
+        if not isinstance(spec, str):
+            raise ValueError(f"无法识别的时区: {spec!r}")
+        self.name = spec
+        if spec == 'local':
+            self.tzinfo = None
+            return
+        if spec.upper() in ('UTC', 'GMT', 'Z'):
+            self.tzinfo = timezone.utc
+            return
+        match = _OFFSET.match(spec.strip())
+        if match:
+            sign, hours, minutes = match.groups()
+            offset = timedelta(hours=int(hours), minutes=int(minutes or 0))
+            if offset >= timedelta(hours=24):
+                raise ValueError(f"无效的时区偏移: {spec}")
+            self.tzinfo = timezone(-offset if sign == '-' else offset)
+            return
+        try:
+            from zoneinfo import ZoneInfo
+            self.tzinfo = ZoneInfo(spec)
+        except Exception as e:
+            raise ValueError(f"无法识别的时区: {spec}") from e
+
+    def from_us(self, us):
+        """UTC纪元微秒 -> 本时区的墙上时间（不带时区信息的datetime）"""
+        return (EPOCH + timedelta(microseconds=us)).astimezone(self.tzinfo).replace(tzinfo=None)
+
+    def to_us(self, dt):
+        """本时区的墙上时间 -> UTC纪元微秒（from_us()的逆运算）"""
+        aware = dt.astimezone() if self.tzinfo is None else dt.replace(tzinfo=self.tzinfo)
+        return (aware - EPOCH) // ONE_US
+
+    def __repr__(self):
+        return f"DisplayZone({self.name!r})"
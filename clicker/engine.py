@@ -0,0 +1,596 @@
+import json
+import os
+import struct
+import threading
+import time
+
+from event_log import log
+from clock_sync import ClockSync, SYNC_MODES
+from display_zone import DisplayZone, DEFAULT_ZONE
+from trigger import PrecisionTrigger
+from scheduler import Job, JobScheduler
+from click_pipeline import ArmedRun, ClickWorkerPool
+from input_backend import create_backend
+from process_pool import ProcessClickPool
+from click_plan import PlanCompiler
+from sync_planner import SyncPlanner
+from coordinate_store import CoordinateStore
+from persistence import CoordinateJournal, atomic_write_json
+from instrumentation import Timeline, TRIGGER
+
+# 引擎通知的事件类型
+COORDINATES_CHANGED = 'coordinates'   # 坐标列表变化，附带修改列表 [(序号, 删除数量, 插入的坐标列表), ...]
+JOBS_CHANGED = 'jobs'                 # 定时任务变化
+RUN_ARMED = 'armed'                   # 定时执行已预热，等待截止时刻
+RUN_STARTED = 'running'               # 开始执行点击
+RUN_STOPPED = 'stopped'               # 点击已停止
+
+
+def _number(kind, minimum=0):
+    """设置项校验：不小于 minimum 的数字，转换为 kind"""
+    def convert(value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("不是数字")
+        if value < minimum:
+            raise ValueError(f"不能小于{minimum}")
+        return kind(value)
+    return convert
+
+
+def _choice(*options):
+    """设置项校验：必须是给定选项之一"""
+    def convert(value):
+        if value not in options:
+            raise ValueError(f"可选值: {', '.join(options)}")
+        return value
+    return convert
+
+
+def _text(value):
+    if not isinstance(value, str):
+        raise ValueError("不是字符串")
+    return value
+
+
+def _servers(value):
+    if value is not None and (not isinstance(value, list) or not all(isinstance(v, str) for v in value)):
+        raise ValueError("必须是URL字符串列表")
+    return value
+
+
+# 可以直接读写的设置项: (属性名/键名, 默认值, 校验转换函数)
+SETTINGS = [
+    ('click_interval', 0.1, _number(float)),
+    ('sync_mode', "bracket", _choice(*SYNC_MODES)),
+    ('time_servers', None, _servers),
+    ('warmup_seconds', 5.0, _number(float)),
+    ('max_fire_lateness', 1.0, _number(float)),
+    ('input_backend', "auto", _text),
+    ('executor', "thread", _choice("thread", "process")),
+    ('double_clicks', 2, _number(int, 1)),
+    ('intra_click_delay', 0.01, _number(float)),
+    ('record_stream_hz', 10, _number(int)),
+    ('merge_tolerance', 0, _number(int)),
+    ('display_refresh_ms', 1000, _number(int, 10)),
+    ('log_level', "INFO", _text),
+    ('log_file', 'events.jsonl', _text),
+    ('timeline_keep', 50, _number(int)),
+]
+
+
+class ClickerEngine:
+    """
+    定时点击引擎（无界面）
+    负责坐标、设置、网络时钟、定时调度和点击执行，不依赖 tkinter、keyboard，
+    界面或命令行只通过 on_event 回调观察引擎状态变化
+    """
+
+    def __init__(self, coordinates_file='coordinates.json', settings_file='settings.json', clock=None):
+        """
+        Args:
+            coordinates_file: 坐标保存文件
+            settings_file: 设置保存文件
+            clock: ClockSync 实例，默认使用内置的时间服务器
+        """
+        # 核心状态变量
+        self.coordinates = CoordinateStore()  # 存储所有记录的坐标点 (x1,y1), (x2,y2),...
+        self.coordinates.on_change = self._on_coordinates_changed
+        self.is_running = False           # 是否正在执行点击
+        self.click_interval = 0.1         # 点击间隔时间(秒)
+        self.display_refresh_ms = 1000    # 状态显示刷新间隔(毫秒)
+        self.display_timezone = DEFAULT_ZONE  # 执行时刻和显示所用的时区: +08:00 / UTC / local / Asia/Shanghai ...
+        self.log_level = "INFO"           # 日志级别: DEBUG / INFO / WARNING / ERROR
+        self.sync_mode = "bracket"        # HTTP时间同步模式: fast(单次请求) / bracket(秒边界夹逼)
+        self.time_servers = None          # 时间服务器URL列表（ntp:// 或 http(s)://），None为内置默认列表
+        self._invalid_jobs = []           # 设置文件中无法解析的任务，保存时原样写回
+        self.warmup_seconds = 5.0         # 截止时刻前多少秒开始预热点击流程
+        self.max_fire_lateness = 1.0      # 超过截止时刻该秒数仍未触发（如系统休眠）时跳过本次执行
+        self.input_backend = "auto"       # 输入后端: auto / sendinput / xtest / pyautogui
+        self.executor = "thread"          # 点击执行器: thread(线程池) / process(每个分片一个进程)
+        self.double_clicks = 2            # 每个坐标每轮连续双击的次数
+        self.intra_click_delay = 0.01     # 同一坐标两次双击之间的间隔(秒)
+        self.record_stream_hz = 10        # 按住录制键时每秒记录的坐标数，0为每次按键只记录一个
+        self.merge_tolerance = 0          # 新坐标与已有坐标相距不超过该像素数时视为重复
+
+        # 文件路径
+        self.coordinates_file = coordinates_file      # 旧版本的JSON坐标文件，只在首次加载时迁移
+        self.journal = CoordinateJournal(os.path.splitext(coordinates_file)[0])  # 坐标快照(.bin)和修改日志(.journal)
+        self.settings_file = settings_file
+        # 上次运行的时钟模型，与设置文件放在同一目录
+        self.clock_state_file = os.path.join(os.path.dirname(settings_file), 'clock_state.json')
+        self.log_file = 'events.jsonl'    # 结构化日志文件
+
+        # 状态变化回调 on_event(事件类型, *附加信息)，可能在后台线程中调用
+        self.on_event = None
+
+        # 线程相关
+        self.schedule_thread = None       # 定时任务线程
+        self.update_time_thread = None    # 时间同步线程
+
+        # 网络时钟（后台同步，读取无网络I/O）
+        self.clock = clock or ClockSync()
+        self.trigger = PrecisionTrigger(self.clock)
+        self.scheduler = JobScheduler(self.clock)
+        self.scheduler.on_change = self._on_jobs_changed
+        self.sync_planner = SyncPlanner(self.clock)   # 按截止时刻安排同步
+        self._sync_wakeup = threading.Event()
+        self.fire_errors = []             # 每次定时触发的误差记录(微秒)
+        self.click_pool = None            # 复用于所有执行的点击执行器
+        self.plan_compiler = PlanCompiler()   # 坐标和设置不变时复用已编译的点击计划
+        self.timeline = Timeline()        # 最近一次开始执行的时间线（每次执行各用一个，互不覆盖）
+        self.timeline_dir = 'timelines'   # 每次执行后导出时间线的目录
+        self.timeline_keep = 50           # 最多保留的时间线导出文件数，0为不导出
+
+    def _notify(self, event, *details):
+        if self.on_event is not None:
+            try:
+                self.on_event(event, *details)
+            except Exception as e:
+                log.error("状态回调出错", event=event, error=str(e))
+
+    def _on_jobs_changed(self):
+        """任务变化后让触发器和同步计划重新计算目标"""
+        self.trigger.cancel()
+        self._sync_wakeup.set()
+
+    def load(self):
+        """加载坐标、设置和上次的时钟状态，并按设置配置日志"""
+        self.load_coordinates()
+        self.load_settings()
+        self.load_clock_state()
+        log.configure(level=self.log_level, path=self.log_file)
+
+    def start(self, schedule=True):
+        """
+        创建点击执行器，预热时间服务器连接并启动后台线程
+        Args:
+            schedule: 是否启动定时任务线程；只做手动执行时可以为False
+        """
+        if self.executor == "process":
+            self.click_pool = ProcessClickPool(self.input_backend)
+            self.click_pool.start()   # 进程启动较慢，不等到预热时才创建
+        else:
+            self.click_pool = ClickWorkerPool(create_backend(self.input_backend))
+        self.clock.mode = self.sync_mode
+        self.sync_planner.lead_s = self.warmup_seconds + 1   # 最后一次同步在预热开始前完成
+        self.clock.warm_up()  # 提前建立到时间服务器的长连接
+
+        self.update_time_thread = threading.Thread(target=self.update_network_time, daemon=True)
+        self.update_time_thread.start()
+        if schedule:
+            self.schedule_thread = threading.Thread(target=self.run_schedule, daemon=True)
+            self.schedule_thread.start()
+
+    def close(self):
+        """停止点击并释放连接、点击执行器和输入后端"""
+        self.is_running = False
+        self.trigger.cancel()
+        self.save_clock_state()
+        self.clock.close()
+        if self.click_pool is not None:
+            self.click_pool.close()
+        self.save_coordinates()
+        self.journal.close()
+        log.flush()
+
+    def get_network_time(self):
+        """获取网络时间（读取本地时钟模型，不做网络请求）"""
+        return self.clock.now()
+
+    def update_network_time(self):
+        """后台按同步计划与时间服务器同步时钟模型"""
+        while True:
+            try:
+                entry = self.scheduler.peek()
+                delay = self.sync_planner.next_delay(entry[0] if entry else None, busy=self.is_running)
+                if delay > 0:
+                    # 任务变化时提前醒来重新规划
+                    self._sync_wakeup.wait(delay)
+                    self._sync_wakeup.clear()
+                    continue
+                started = time.perf_counter()
+                ok = self.clock.sync_once()
+                self.sync_planner.record(ok, time.perf_counter() - started)
+                if ok:
+                    self.save_clock_state()
+
+            except Exception as e:
+                log.error("时间更新失败", error=str(e))
+                time.sleep(1)  # 出错后等待1秒再试
+
+    def run_schedule(self):
+        """
+        运行定时任务（使用网络时间）
+        不断执行调度堆中最近的任务，没有任务时定期检查
+        """
+        while True:
+            try:
+                if self.scheduler.peek() is None:
+                    time.sleep(0.5)  # 没有待执行的任务
+                    continue
+                self.run_next()
+
+            except Exception as e:
+                log.error("定时任务出错", error=str(e))
+                time.sleep(1)  # 出错后等待1秒再试
+
+    def run_next(self):
+        """
+        等待并执行调度堆中最近的一个任务
+        由精确触发器等待到点后在当前线程直接执行点击，直到 is_running 被置为False
+        Returns:
+            执行的任务；没有任务、等待期间任务被修改或已在执行中时返回None
+        """
+        generation = self.trigger.generation   # 在读取任务之前记下，之后的任务修改都会使等待作废
+        entry = self.scheduler.peek()
+        if entry is None:
+            return None
+        deadline_us, job = entry
+        if self._missed(job, deadline_us, self.clock.now_us() - deadline_us):
+            return None
+        log.info("下一个任务", job=job.name,
+                 at=self.clock.from_us(deadline_us).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3])
+
+        # 预热阶段：截止时刻前提前准备好点击流程
+        warmup_us = deadline_us - int(self.warmup_seconds * 1_000_000)
+        if warmup_us > self.clock.now_us() and self.trigger.wait(warmup_us, generation=generation) is None:
+            return None  # 任务已修改，重新计算目标
+        coordinates = job.coordinates if job.coordinates is not None else self.coordinates
+        click_interval = job.click_interval if job.click_interval is not None else self.click_interval
+        if not coordinates:
+            # 空计划没有可执行的分组，点击线程会一直空转到手动停止
+            log.warning("没有记录的坐标，跳过本次执行", job=job.name)
+            self.scheduler.complete(job, deadline_us)
+            return None
+        try:
+            run = self.prepare_run(coordinates, click_interval)
+        except Exception as e:
+            # 执行器无法就绪（如输入后端不可用）：跳过本次执行，不在截止时刻前反复重试
+            log.error("预热失败，跳过本次执行", job=job.name, error=str(e))
+            self.scheduler.complete(job, deadline_us)
+            return None
+        self._notify(RUN_ARMED)
+
+        error_us = self.trigger.wait(deadline_us, generation=generation)
+        if error_us is None or self.scheduler.peek() != entry:
+            return None  # 任务已修改，重新计算目标
+        if self._missed(job, deadline_us, error_us):
+            return None
+        self.scheduler.complete(job, deadline_us)
+        if self.is_running:
+            log.warning("已在执行中，跳过本次定时触发", job=job.name)
+            return None
+
+        self.is_running = True
+        self.timeline = run.timeline
+        self.timeline.record(TRIGGER, self.trigger.last_fire_ns, self.trigger.last_deadline_ns)
+        self.fire_errors.append(error_us)
+        self._notify(RUN_STARTED)
+        try:
+            run.fire()  # 触发后立即把编译好的计划交给已就绪的点击线程
+        finally:
+            self.stop_clicking()  # 执行器出错时也要恢复为未运行状态
+        log.info("任务执行结束", job=job.name, fire_error_ms=round(error_us / 1000, 3),
+                 coordinates=len(coordinates))
+        self.export_timeline(run.timeline, source="schedule", job=job.name, fire_error_us=error_us)
+        return job
+
+    def _missed(self, job, deadline_us, late_us):
+        """
+        截止时刻已过去太久（系统休眠、时钟大幅修正）时跳过本次执行，排入该任务的下一次执行
+        Returns:
+            是否已跳过
+        """
+        if late_us <= self.max_fire_lateness * 1_000_000:
+            return False
+        log.warning("错过执行时刻，跳过本次执行", job=job.name, late_ms=round(late_us / 1000, 1))
+        self.scheduler.complete(job, deadline_us)
+        return True
+
+    def describe_next_run(self):
+        """下一次执行的文字描述"""
+        entry = self.scheduler.peek()
+        if entry is None:
+            return "下次执行时间: 无"
+        deadline_us, job = entry
+        next_run = self.clock.from_us(deadline_us)
+        return f"下次执行时间: {next_run.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} ({job.name})"
+
+    def add_coordinate(self, x, y):
+        """
+        记录一个坐标，已存在或在合并距离内的坐标不重复记录
+        Returns:
+            是否新增了坐标
+        """
+        return self.coordinates.add(x, y)
+
+    def delete_coordinates(self, indices):
+        """删除指定序号的坐标"""
+        return self.coordinates.delete(indices)
+
+    def clear_coordinates(self):
+        """清空所有已记录的坐标"""
+        self.coordinates.clear()
+
+    def _on_coordinates_changed(self, changes):
+        """坐标每次修改都立即追加到日志，崩溃时不会丢失已记录的坐标"""
+        if self.journal.active:
+            try:
+                self.journal.append(changes)
+                if self.journal.should_compact():
+                    self.journal.checkpoint(self.coordinates.to_list())
+            except OSError as e:
+                log.error("写入坐标日志失败", error=str(e))
+        self._notify(COORDINATES_CHANGED, changes)
+
+    def save_coordinates(self):
+        """把日志合并成新的坐标快照"""
+        try:
+            self.journal.checkpoint(self.coordinates.to_list())
+        except Exception as e:
+            log.error("保存坐标失败", error=str(e))
+
+    def load_coordinates(self):
+        """从快照和日志加载保存的坐标，并打开日志记录之后的修改"""
+        try:
+            points = self.journal.load()
+            if points is None and os.path.exists(self.coordinates_file):
+                # 旧版本的JSON坐标文件：转换成快照，原文件保留但不再写入
+                with open(self.coordinates_file, 'r') as f:
+                    points = [tuple(p) for p in json.load(f)]
+                self.journal.checkpoint(points)
+                log.info("已迁移坐标文件", source=self.coordinates_file, count=len(points))
+            if points is not None:
+                self.coordinates.replace(points)
+        except (ValueError, struct.error) as e:
+            log.error("坐标文件已损坏，已改名保留并从空白开始", error=str(e))
+            self.journal.quarantine()
+        except Exception as e:
+            log.error("加载坐标失败", error=str(e))
+        try:
+            self.journal.open()
+        except OSError as e:
+            log.error("打开坐标日志失败", error=str(e))
+
+    def start_clicking(self):
+        """
+        在后台线程开始执行点击
+        Returns:
+            没有记录的坐标时返回False
+        """
+        if not self.coordinates:
+            return False
+        self.is_running = True
+        self._notify(RUN_STARTED)
+        threading.Thread(target=self.clicking_thread, daemon=True).start()
+        return True
+
+    def stop_clicking(self):
+        """停止点击任务"""
+        was_running = self.is_running
+        self.is_running = False
+        if was_running:
+            self._notify(RUN_STOPPED)
+        return was_running
+
+    def prepare_run(self, coordinates=None, click_interval=None):
+        """
+        创建并预热一次点击执行
+        每次执行使用自己的时间线：定时任务预热时可能还有手动执行在进行，不能清空它的记录
+        Args:
+            coordinates: 本次执行的坐标列表，默认使用当前记录的坐标
+            click_interval: 本次执行的点击间隔(秒)，默认使用全局设置
+        """
+        if coordinates is None:
+            coordinates = self.coordinates
+        if click_interval is None:
+            click_interval = self.click_interval
+        plan = self.plan_compiler.compile(coordinates, self.click_pool.size, self.double_clicks,
+                                          self.intra_click_delay, click_interval)
+        run = ArmedRun(self.click_pool, plan, lambda: self.is_running, Timeline())
+        run.prepare()
+        return run
+
+    def export_timeline(self, timeline, **meta):
+        """导出一次执行的时间线并记录迟到/抖动统计，只保留最近 timeline_keep 个文件"""
+        if not self.timeline_keep:
+            return
+        try:
+            path = timeline.export(self.timeline_dir, meta, keep=self.timeline_keep)
+            report = timeline.report()
+            log.info("时间线已导出", path=path,
+                     first_event_late_us=report['first_event_lateness_us'],
+                     p50_us=report['event_lateness']['p50_us'],
+                     p99_us=report['event_lateness']['p99_us'],
+                     max_us=report['event_lateness']['max_us'])
+        except Exception as e:
+            log.error("导出时间线失败", error=str(e))
+
+    def clicking_thread(self, coordinates=None, click_interval=None):
+        """
+        点击执行线程
+        根据CPU核心数分组执行点击，每组坐标由执行器中固定的一个线程或进程处理
+        """
+        run = None
+        try:
+            run = self.prepare_run(coordinates, click_interval)
+            self.timeline = run.timeline
+            run.fire()
+        except Exception as e:
+            log.error("点击执行出错", error=str(e))
+        finally:
+            self.stop_clicking()  # 执行器出错时也要恢复为未运行状态
+        if run is not None:
+            self.export_timeline(run.timeline, source="manual")
+
+    def save_job(self, job):
+        """保存（新增或修改）定时任务并写入设置文件"""
+        self.scheduler.add_job(job)
+        self.save_settings()
+        self._notify(JOBS_CHANGED)
+
+    def delete_job(self, name):
+        """删除定时任务并写入设置文件"""
+        self.scheduler.remove_job(name)
+        self.save_settings()
+        self._notify(JOBS_CHANGED)
+
+    def set_click_interval(self, seconds):
+        """修改点击间隔(秒)并写入设置文件"""
+        self.click_interval = seconds
+        self.save_settings()
+
+    def set_display_timezone(self, spec):
+        """
+        修改执行时刻和显示所用的时区，无法识别时保持北京时间
+        调度本身使用UTC纪元时间，修改后各任务的下一次执行时刻按新时区重新计算
+        """
+        try:
+            zone = DisplayZone(spec)
+        except ValueError as e:
+            log.warning("时区设置无效，使用默认时区", zone=spec, default=DEFAULT_ZONE, error=str(e))
+            zone = DisplayZone(DEFAULT_ZONE)
+        self.display_timezone = zone.name
+        self.clock.zone = zone
+        self.scheduler.rebuild()
+
+    def save_clock_state(self):
+        """保存时钟偏移、漂移和各服务器的统计，下次启动时不必从零开始同步"""
+        try:
+            state = self.clock.export_state()
+            if state is not None:
+                atomic_write_json(self.clock_state_file, state)
+        except Exception as e:
+            log.error("保存时钟状态失败", error=str(e))
+
+    def load_clock_state(self):
+        """加载上次保存的时钟状态，恢复后按新的网络时间重新计算各任务的执行时刻"""
+        try:
+            if os.path.exists(self.clock_state_file):
+                with open(self.clock_state_file, 'r') as f:
+                    state = json.load(f)
+                if self.clock.restore_state(state):
+                    self.scheduler.rebuild()
+        except Exception as e:
+            log.warning("加载时钟状态失败", error=str(e))
+
+    def save_settings(self):
+        """保存程序设置到文件"""
+        try:
+            settings = {
+                'jobs': [job.to_dict() for job in self.scheduler.jobs.values()] + self._invalid_jobs,
+                'click_interval': self.click_interval,
+                'sync_mode': self.sync_mode,
+                'time_servers': self.time_servers,
+                'warmup_seconds': self.warmup_seconds,
+                'max_fire_lateness': self.max_fire_lateness,
+                'input_backend': self.input_backend,
+                'executor': self.executor,
+                'double_clicks': self.double_clicks,
+                'intra_click_delay': self.intra_click_delay,
+                'record_stream_hz': self.record_stream_hz,
+                'merge_tolerance': self.merge_tolerance,
+                'display_refresh_ms': self.display_refresh_ms,
+                'display_timezone': self.display_timezone,
+                'log_level': self.log_level,
+                'log_file': self.log_file,
+                'timeline_keep': self.timeline_keep
+            }
+            atomic_write_json(self.settings_file, settings)
+        except Exception as e:
+            log.error("保存设置失败", error=str(e))
+
+    def load_settings(self):
+        """
+        从文件加载程序设置
+        每个任务和每项设置分别校验：无效的设置项使用默认值，无法解析的任务跳过，
+        但会在保存设置时原样写回，不会因为一处错误丢失其他设置和任务
+        """
+        settings = {}
+        if os.path.exists(self.settings_file):
+            try:
+                with open(self.settings_file, 'r') as f:
+                    settings = json.load(f)
+                if not isinstance(settings, dict):
+                    raise ValueError("设置文件内容不是JSON对象")
+            except (OSError, ValueError) as e:
+                settings = {}
+                log.error("设置文件无法读取，使用默认设置", error=str(e))
+                try:
+                    # 改名保留，避免下次保存设置时覆盖
+                    os.replace(self.settings_file, self.settings_file + '.corrupt')
+                except OSError:
+                    pass
+
+        for key, default, convert in SETTINGS:
+            value = default
+            if key in settings:
+                try:
+                    value = convert(settings[key])
+                except ValueError as e:
+                    log.warning("设置项无效，使用默认值", key=key, value=repr(settings[key]),
+                                default=default, error=str(e))
+            setattr(self, key, value)
+        if self.time_servers:
+            self.clock.set_servers(self.time_servers)
+        self.set_display_timezone(settings.get('display_timezone', DEFAULT_ZONE))
+
+        self._invalid_jobs = []
+        if 'jobs' in settings:
+            raw_jobs = settings['jobs'] if isinstance(settings['jobs'], list) else [settings['jobs']]
+        else:
+            # 兼容旧版本只有单个 "HH:MM" 执行时间的设置文件
+            raw_jobs = [{'name': "默认任务", 'time': settings.get('scheduled_time', "20:00")}]
+        jobs = []
+        for data in raw_jobs:
+            try:
+                jobs.append(Job.from_dict(data))
+            except Exception as e:
+                log.error("任务设置无效，已跳过", job=repr(data), error=str(e))
+                self._invalid_jobs.append(data)
+        self.scheduler.set_jobs(jobs)
+        self.coordinates.tolerance = self.merge_tolerance
+        self._notify(JOBS_CHANGED)
+
+    def format_status(self):
+        """
+        根据内存中的时钟模型和运行状态生成状态文字
+        只读取后台线程维护的数据，不做任何网络I/O，可以在界面线程中调用
+        """
+        current_time = self.get_network_time()
+        current_ms = current_time.microsecond // 1000
+
+        status_text = "正在执行点击...\n" if self.is_running else ""
+        status_text += (f"当前网络时间({self.display_timezone}): "
+                        f"{current_time.strftime('%Y-%m-%d %H:%M:%S')}.{current_ms:03d}\n")
+        error_us = self.clock.error_us()
+        if error_us is None:
+            status_text += "时钟尚未同步，暂用本地时间\n"
+        else:
+            source = "秒前同步" if self.clock.synced else "秒前同步，沿用上次运行的结果"
+            status_text += (f"时钟偏移: {self.clock.offset_us()/1000:+.1f}ms ±{error_us/1000:.1f}ms "
+                            f"({self.clock.sync_age_s():.0f}{source})\n")
+        status_text += self.describe_next_run()
+        if self.trigger.last_error_us is not None:
+            status_text += f"\n上次触发误差: {self.trigger.last_error_us/1000:+.3f}ms"
+        return status_text
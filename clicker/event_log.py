@@ -0,0 +1,134 @@
+import collections
+import json
+import threading
+import time
+from datetime import datetime
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+LEVELS = {name: level for level, name in LEVEL_NAMES.items()}
+
+
+class EventLog:
+    """
+    结构化异步日志
+    调用方只把事件追加到内存队列（deque.append 在CPython中是原子操作，无需加锁），
+    由后台线程统一格式化并写入控制台和JSONL文件，热路径上不做任何控制台或文件I/O
+    """
+
+    def __init__(self, level=INFO, path=None, console=True, capacity=100000, flush_interval=0.05):
+        """
+        Args:
+            level: 最低记录级别，低于该级别的调用立即返回
+            path: JSONL日志文件路径，为None时不写文件
+            console: 是否同时输出到控制台
+            capacity: 队列容量，写入跟不上时丢弃最旧的事件
+            flush_interval: 后台线程写出间隔(秒)
+        """
+        self.level = level
+        self.path = path
+        self.console = console
+        self.flush_interval = flush_interval
+        self._queue = collections.deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def configure(self, level=None, path=None, console=None):
+        """
+        修改日志级别和输出目标
+        Args:
+            level: 级别数值或名称（不区分大小写），无法识别时使用 INFO
+        """
+        if level is not None:
+            if isinstance(level, str):
+                value = LEVELS.get(level.strip().upper())
+            else:
+                value = level if isinstance(level, int) and not isinstance(level, bool) else None
+            self.level = INFO if value is None else value
+            if value is None:
+                self.warning("无法识别的日志级别，使用INFO", log_level=repr(level))
+        if path is not None:
+            self.path = path or None
+        if console is not None:
+            self.console = console
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, message, **fields):
+        """
+        记录一条事件
+        Args:
+            level: 级别
+            message: 事件描述
+            fields: 结构化字段
+        """
+        if level < self.level:
+            return
+        self._queue.append((time.time_ns(), level, threading.current_thread().name, message, fields))
+        if self._thread is None:
+            self._start()
+
+    def debug(self, message, **fields):
+        if self.level <= DEBUG:
+            self.log(DEBUG, message, **fields)
+
+    def info(self, message, **fields):
+        if self.level <= INFO:
+            self.log(INFO, message, **fields)
+
+    def warning(self, message, **fields):
+        if self.level <= WARNING:
+            self.log(WARNING, message, **fields)
+
+    def error(self, message, **fields):
+        self.log(ERROR, message, **fields)
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer, daemon=True, name="EventLog")
+                self._thread.start()
+
+    def _writer(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def _drain(self):
+        if not self._queue:
+            return
+        console_lines = []
+        file_lines = []
+        while self._queue:
+            stamp_ns, level, thread, message, fields = self._queue.popleft()
+            if self.console:
+                when = datetime.fromtimestamp(stamp_ns / 1_000_000_000).strftime('%H:%M:%S.%f')[:-3]
+                extra = ' '.join(f"{k}={v}" for k, v in fields.items())
+                console_lines.append(f"{when} [{LEVEL_NAMES[level]}] {message} {extra}".rstrip())
+            if self.path:
+                record = {'ts_ns': stamp_ns, 'level': LEVEL_NAMES[level], 'thread': thread, 'msg': message}
+                record.update(fields)
+                file_lines.append(json.dumps(record, ensure_ascii=False, default=str))
+        if console_lines:
+            print('\n'.join(console_lines))
+        if file_lines:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(file_lines) + '\n')
+            except OSError as e:
+                print(f"写入日志文件失败: {str(e)}")
+
+    def flush(self):
+        """在当前线程立即写出所有待写事件（用于退出前）"""
+        self._drain()
+
+
+# 全局日志实例，各模块通过 from event_log import log 使用
+log = EventLog()
@@ -0,0 +1,56 @@
+import calendar
+from email.utils import parsedate_tz
+
+MONTHS = {name: i for i, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+SECOND_US = 1_000_000
+
+# 同一个Date值在一秒内会被反复收到（夹逼探测、多次采样），缓存最近一次的解析结果
+# 元组整体替换，多线程读写无需加锁
+_last = ('', 0)
+
+
+def days_from_civil(year, month, day):
+    """公历日期距1970-01-01的天数（不经过datetime，任意年份均正确）"""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def parse_http_date(value):
+    """
+    解析HTTP Date头，返回Unix纪元微秒（UTC）
+    RFC 7231 IMF-fixdate（"Sun, 06 Nov 1994 08:49:37 GMT"）按固定位置直接解析，
+    与区域设置无关；其他两种过时格式交给 email.utils 处理
+    Raises:
+        ValueError: 无法识别的日期
+    """
+    global _last
+    cached, us = _last
+    if value == cached:
+        return us
+    try:
+        if len(value) != 29 or value[3:5] != ', ' or value[25:] != ' GMT':
+            raise ValueError
+        month = MONTHS[value[8:11]]
+        day, year = int(value[5:7]), int(value[12:16])
+        hour, minute, second = int(value[17:19]), int(value[20:22]), int(value[23:25])
+    except (KeyError, ValueError):
+        return _parse_obsolete(value)
+    if not (1 <= day <= 31 and hour <= 23 and minute <= 59 and second <= 60):
+        raise ValueError(f"无效的Date头: {value}")
+    us = ((days_from_civil(year, month, day) * 24 + hour) * 60 + minute) * 60 + second
+    us *= SECOND_US
+    _last = (value, us)
+    return us
+
+
+def _parse_obsolete(value):
+    """RFC 850 和 asctime 格式（极少见）"""
+    parts = parsedate_tz(value)
+    if parts is None:
+        raise ValueError(f"无效的Date头: {value}")
+    return (calendar.timegm(parts[:9]) - (parts[9] or 0)) * SECOND_US
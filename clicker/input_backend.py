@@ -0,0 +1,247 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+import time
+
+from event_log import log
+
+# 输入事件类型（均为鼠标左键）
+MOVE = 0
+DOWN = 1
+UP = 2
+
+
+def double_click_events(x, y):
+    """一次双击对应的原始事件序列"""
+    return [(MOVE, x, y), (DOWN, x, y), (UP, x, y), (DOWN, x, y), (UP, x, y)]
+
+
+class InputBackend:
+    """
+    输入后端基类
+    以原始的移动/按下/抬起事件为单位注入鼠标输入，send() 一次提交一批事件
+    """
+
+    name = 'base'
+
+    def send(self, events):
+        """
+        提交一批事件，同一批事件不会与其他线程的事件交错
+        Args:
+            events: [(事件类型, x, y), ...]
+        """
+        raise NotImplementedError
+
+    def double_click(self, x, y):
+        self.send(double_click_events(x, y))
+
+    def warm_up(self):
+        """预先初始化后端（加载库、建立连接），避免首次点击时的冷启动开销"""
+        pass
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(InputBackend):
+    """兼容后端：通过 pyautogui 的高层接口点击，受其默认 PAUSE 和安全检查限制"""
+
+    name = 'pyautogui'
+
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+
+    def send(self, events):
+        for action, x, y in events:
+            if action == MOVE:
+                self.pyautogui.moveTo(x, y)
+            elif action == DOWN:
+                self.pyautogui.mouseDown(x, y)
+            else:
+                self.pyautogui.mouseUp(x, y)
+
+    def double_click(self, x, y):
+        self.pyautogui.doubleClick(x, y)
+
+    def warm_up(self):
+        self.pyautogui.position()
+
+
+class RecordingBackend(InputBackend):
+    """测试用后端：不产生真实输入，只记录事件及其 perf_counter_ns 时间戳"""
+
+    name = 'recording'
+
+    def __init__(self):
+        self.events = []                  # [(时间戳ns, 事件类型, x, y), ...]
+        self.batches = 0                  # send() 调用次数
+        self._lock = threading.Lock()
+
+    def send(self, events):
+        stamp = time.perf_counter_ns()
+        with self._lock:
+            self.batches += 1
+            self.events.extend((stamp, action, x, y) for action, x, y in events)
+
+    def clicks(self):
+        """记录到的按下事件坐标列表"""
+        return [(x, y) for _, action, x, y in self.events if action == DOWN]
+
+
+class XTestBackend(InputBackend):
+    """
+    Linux X11 后端：通过 XTest 扩展直接注入原始事件
+    一批事件写入Xlib缓冲后只调用一次 XFlush
+    """
+
+    name = 'xtest'
+
+    def __init__(self):
+        x11_path = ctypes.util.find_library('X11')
+        xtst_path = ctypes.util.find_library('Xtst')
+        if not x11_path or not xtst_path or not os.environ.get('DISPLAY'):
+            raise OSError("XTest 不可用")
+        self.x11 = ctypes.cdll.LoadLibrary(x11_path)
+        self.xtst = ctypes.cdll.LoadLibrary(xtst_path)
+        self.x11.XInitThreads()
+        self.x11.XOpenDisplay.restype = ctypes.c_void_p
+        self.x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.x11.XFlush.argtypes = [ctypes.c_void_p]
+        self.x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self.x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                                   ctypes.c_int, ctypes.c_ulong]
+        self.xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                                   ctypes.c_ulong]
+        self.display = self.x11.XOpenDisplay(None)
+        if not self.display:
+            raise OSError("无法连接X服务器")
+        self._lock = threading.Lock()     # 保证一批事件连续注入
+
+    def send(self, events):
+        with self._lock:
+            for action, x, y in events:
+                if action == MOVE:
+                    self.xtst.XTestFakeMotionEvent(self.display, -1, x, y, 0)
+                else:
+                    self.xtst.XTestFakeButtonEvent(self.display, 1, action == DOWN, 0)
+            self.x11.XFlush(self.display)
+
+    def warm_up(self):
+        with self._lock:
+            self.x11.XSync(self.display, 0)
+
+    def close(self):
+        if self.display:
+            self.x11.XCloseDisplay(self.display)
+            self.display = None
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', ctypes.c_long),
+                ('dy', ctypes.c_long),
+                ('mouseData', ctypes.c_ulong),
+                ('dwFlags', ctypes.c_ulong),
+                ('time', ctypes.c_ulong),
+                ('dwExtraInfo', ctypes.c_size_t)]
+
+
+class INPUT(ctypes.Structure):
+    # MOUSEINPUT 是 INPUT 联合体中最大的成员，直接内联即可
+    _fields_ = [('type', ctypes.c_ulong),
+                ('mi', MOUSEINPUT)]
+
+
+class SendInputBackend(InputBackend):
+    """
+    Windows 后端：一批事件打包成 INPUT 数组，只调用一次 SendInput
+    SendInput 保证同一批事件不会与其他输入交错
+    """
+
+    name = 'sendinput'
+
+    MOUSEEVENTF_MOVE = 0x0001
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_ABSOLUTE = 0x8000
+
+    def __init__(self):
+        if sys.platform != 'win32':
+            raise OSError("SendInput 仅支持Windows")
+        self.user32 = ctypes.windll.user32
+        self.user32.SetProcessDPIAware()  # 与 pyautogui 一致，使用物理像素坐标
+        self.screen_w = self.user32.GetSystemMetrics(0)
+        self.screen_h = self.user32.GetSystemMetrics(1)
+        self._flags = {
+            MOVE: self.MOUSEEVENTF_MOVE | self.MOUSEEVENTF_ABSOLUTE,
+            DOWN: self.MOUSEEVENTF_LEFTDOWN,
+            UP: self.MOUSEEVENTF_LEFTUP
+        }
+
+    def send(self, events):
+        inputs = (INPUT * len(events))()
+        for item, (action, x, y) in zip(inputs, events):
+            item.type = 0  # INPUT_MOUSE
+            item.mi.dwFlags = self._flags[action]
+            if action == MOVE:
+                # 绝对坐标归一化到 0~65535
+                item.mi.dx = x * 65535 // max(1, self.screen_w - 1)
+                item.mi.dy = y * 65535 // max(1, self.screen_h - 1)
+        sent = self.user32.SendInput(len(events), inputs, ctypes.sizeof(INPUT))
+        if sent != len(events):
+            raise OSError(f"SendInput 只注入了 {sent}/{len(events)} 个事件")
+
+    def warm_up(self):
+        self.send([])
+
+
+BACKENDS = {
+    'pyautogui': PyAutoGuiBackend,
+    'recording': RecordingBackend,
+    'xtest': XTestBackend,
+    'sendinput': SendInputBackend
+}
+
+
+def create_backend(name='auto'):
+    """
+    创建输入后端
+    Args:
+        name: 后端名称；'auto' 在Windows上优先 SendInput，在Linux上优先 XTest，
+              不可用时回退到 pyautogui
+    """
+    if name != 'auto':
+        return BACKENDS[name]()
+    candidates = [SendInputBackend] if sys.platform == 'win32' else [XTestBackend]
+    for backend in candidates:
+        try:
+            return backend()
+        except OSError as e:
+            log.warning("输入后端不可用", backend=backend.name, error=str(e))
+    return PyAutoGuiBackend()
+
+
+def measure_ceiling(backend, seconds=1.0, batch=20):
+    """
+    测量后端的双击吞吐上限（单线程）
+    注意：真实后端会在屏幕左上角产生实际点击
+    Returns:
+        每秒双击次数
+    """
+    events = []
+    for i in range(batch):
+        events.extend(double_click_events(10 + i, 10))
+    count = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        backend.send(events)
+        count += batch
+    return count / seconds
+
+
+if __name__ == "__main__":
+    backend = create_backend(sys.argv[1] if len(sys.argv) > 1 else 'recording')
+    print(f"{backend.name}: 每秒 {measure_ceiling(backend):.0f} 次双击")
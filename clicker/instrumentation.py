@@ -0,0 +1,197 @@
+import itertools
+import json
+import math
+import os
+import time
+from array import array
+from datetime import datetime
+
+# 时间线记录类型
+TRIGGER = 1         # 触发器检测到截止时刻
+DISPATCH = 2        # 点击计划分发给工作线程
+EVENT = 3           # 一批输入事件提交给后端
+ROUND_START = 4     # 一轮点击开始
+ROUND_END = 5       # 一轮点击结束
+
+KIND_NAMES = {TRIGGER: 'trigger', DISPATCH: 'dispatch', EVENT: 'event',
+              ROUND_START: 'round_start', ROUND_END: 'round_end'}
+
+# 直方图分桶上界(微秒)
+HISTOGRAM_BOUNDS_US = [10, 50, 100, 500, 1000, 5000, 10000, 50000]
+
+
+def percentile(sorted_values, p):
+    """最近秩法百分位数，sorted_values 须已排序"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values), math.ceil(p / 100 * len(sorted_values))) - 1)
+    return sorted_values[rank]
+
+
+def histogram(values_us):
+    """按 HISTOGRAM_BOUNDS_US 分桶计数，最后一个桶为超出上界的部分"""
+    counts = [0] * (len(HISTOGRAM_BOUNDS_US) + 1)
+    for value in values_us:
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_US):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={b}us" for b in HISTOGRAM_BOUNDS_US] + [f">{HISTOGRAM_BOUNDS_US[-1]}us"]
+    return dict(zip(labels, counts))
+
+
+def summarize(values_us):
+    values = sorted(values_us)
+    return {
+        'count': len(values),
+        'p50_us': percentile(values, 50),
+        'p99_us': percentile(values, 99),
+        'max_us': values[-1] if values else None
+    }
+
+
+class Timeline:
+    """
+    点击流程时间线
+    预分配的环形缓冲区，热路径上每条记录只有几次数组写入，不分配对象、不加锁
+    （itertools.count 的 next() 在CPython中是原子操作，多线程可以安全地领取槽位）
+    长时间执行时环形缓冲区会覆盖最早的记录，触发、分发和第一批事件的时刻因此另外保存，
+    迟到统计始终可用
+    """
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.kinds = array('b', bytes(capacity))
+        self.stamps = array('q', bytes(8 * capacity))     # 实际时刻 perf_counter_ns
+        self.planned = array('q', bytes(8 * capacity))    # 计划时刻 perf_counter_ns
+        self.aux = array('i', bytes(4 * capacity))        # 附加数据：EVENT为 组号<<16 | 批大小
+        self._counter = itertools.count()
+        self._clear_marks()
+
+    def _clear_marks(self):
+        self.trigger_ns = 0               # 触发器检测到截止时刻的时刻
+        self.deadline_ns = 0              # 触发器的目标时刻
+        self.dispatch_ns = 0              # 第一次分发的时刻
+        self.first_event_ns = 0           # 最早一批事件的提交时刻
+
+    def reset(self):
+        """开始新的一次执行（在执行开始前调用，不与 record 并发）"""
+        self.kinds[:] = array('b', bytes(self.capacity))
+        self._counter = itertools.count()
+        self._clear_marks()
+
+    def record(self, kind, stamp_ns, planned_ns=0, aux=0):
+        if kind == EVENT:
+            if not self.first_event_ns or stamp_ns < self.first_event_ns:
+                self.first_event_ns = stamp_ns
+        elif kind == TRIGGER:
+            if not self.trigger_ns:
+                self.trigger_ns, self.deadline_ns = stamp_ns, planned_ns
+        elif kind == DISPATCH:
+            if not self.dispatch_ns:
+                self.dispatch_ns = stamp_ns
+        i = next(self._counter) % self.capacity
+        self.kinds[i] = kind
+        self.stamps[i] = stamp_ns
+        self.planned[i] = planned_ns
+        self.aux[i] = aux
+
+    def records(self):
+        """
+        按时间排序的有效记录
+        Returns:
+            [(类型, 实际ns, 计划ns, 附加), ...]
+        """
+        result = [(self.kinds[i], self.stamps[i], self.planned[i], self.aux[i])
+                  for i in range(self.capacity) if self.kinds[i]]
+        result.sort(key=lambda r: r[1])
+        return result
+
+    def report(self):
+        """计算迟到和抖动统计"""
+        records = self.records()
+        events = [r for r in records if r[0] == EVENT]
+        deadline = self.deadline_ns or self.dispatch_ns or None
+
+        # 每批事件相对计划时刻的迟到
+        lateness = [max(0, (stamp - planned) // 1000) for _, stamp, planned, _ in events]
+
+        # 抖动：同一轮同一组内相邻两批的实际间隔与计划间隔之差
+        jitter = []
+        last = {}
+        for kind, stamp, planned, aux in records:
+            if kind == ROUND_START:
+                last = {}
+            elif kind == EVENT:
+                group = aux >> 16
+                if group in last:
+                    prev_stamp, prev_planned = last[group]
+                    jitter.append(abs((stamp - prev_stamp) - (planned - prev_planned)) // 1000)
+                last[group] = (stamp, planned)
+
+        rounds = [r for r in records if r[0] in (ROUND_START, ROUND_END)]
+        durations = [(end[1] - start[1]) // 1000
+                     for start, end in zip(rounds[::2], rounds[1::2])
+                     if start[0] == ROUND_START and end[0] == ROUND_END]
+
+        return {
+            'records': len(records),
+            'wrapped': len(records) == self.capacity,   # 缓冲区写满后最早的记录已被覆盖
+            'trigger_lateness_us': (self.trigger_ns - self.deadline_ns) // 1000 if self.trigger_ns else None,
+            'dispatch_lateness_us': (self.dispatch_ns - deadline) // 1000 if self.dispatch_ns and deadline else None,
+            'first_event_lateness_us': (self.first_event_ns - deadline) // 1000
+                                       if self.first_event_ns and deadline else None,
+            'event_lateness': summarize(lateness),
+            'event_lateness_histogram': histogram(lateness),
+            'jitter': summarize(jitter),
+            'jitter_histogram': histogram(jitter),
+            'round_duration': summarize(durations)
+        }
+
+    def export(self, directory, meta=None, keep=None):
+        """
+        导出时间线文件（文件名精确到毫秒，同名时加序号，不会覆盖之前的导出）
+        Args:
+            directory: 导出目录
+            meta: 写入文件的附加信息
+            keep: 导出后目录中最多保留的时间线文件数（删除最旧的），None为不限
+        Returns:
+            文件路径
+        """
+        os.makedirs(directory, exist_ok=True)
+        name = f"timeline_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]}"
+        path = os.path.join(directory, name + '.json')
+        for n in itertools.count(1):
+            if not os.path.exists(path):
+                break
+            path = os.path.join(directory, f"{name}_{n}.json")
+        records = self.records()
+        base = records[0][1] if records else 0
+        data = {
+            'meta': meta or {},
+            'exported_at': time.time(),
+            'report': self.report(),
+            'timeline': [
+                {'kind': KIND_NAMES.get(kind, kind), 't_us': (stamp - base) / 1000,
+                 'late_us': (stamp - planned) / 1000 if planned else None, 'aux': aux}
+                for kind, stamp, planned, aux in records
+            ]
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        if keep is not None:
+            prune_exports(directory, keep)
+        return path
+
+
+def prune_exports(directory, keep):
+    """删除最旧的时间线文件，只保留最近 keep 个（文件名按导出时刻排序）"""
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith('timeline_') and name.endswith('.json'))
+    for name in names[:max(0, len(names) - keep)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
@@ -0,0 +1,216 @@
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from event_log import log
+
+SNAPSHOT_MAGIC = b'CLKS'
+JOURNAL_MAGIC = b'CLKJ'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sHI')      # 文件类型, 格式版本, 快照代数
+_COUNT = struct.Struct('<I')          # 快照中的坐标数量
+_RECORD = struct.Struct('<III')       # 日志记录: 序号, 删除数量, 插入数量
+_CRC = struct.Struct('<I')
+
+
+def fsync_directory(path):
+    """同步目录项，保证重命名在掉电后仍然生效（Windows不支持打开目录，跳过）"""
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, data):
+    """
+    原子地替换文件内容：先写临时文件并 fsync，再重命名覆盖目标
+    任何时刻崩溃，目标文件要么是旧内容，要么是完整的新内容
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_directory(path)
+
+
+def atomic_write_json(path, obj):
+    atomic_write(path, json.dumps(obj).encode('ascii'))
+
+
+def _pack_points(points):
+    xs = array('i', [p[0] for p in points])
+    ys = array('i', [p[1] for p in points])
+    if sys.byteorder == 'big':   # 文件中统一使用小端
+        xs.byteswap()
+        ys.byteswap()
+    return xs.tobytes() + ys.tobytes()
+
+
+def _unpack_points(data, count):
+    xs = array('i')
+    ys = array('i')
+    xs.frombytes(data[:4 * count])
+    ys.frombytes(data[4 * count:8 * count])
+    if sys.byteorder == 'big':
+        xs.byteswap()
+        ys.byteswap()
+    return list(zip(xs, ys))
+
+
+class CoordinateJournal:
+    """
+    坐标的增量持久化
+    <base>.bin 是二进制快照，<base>.journal 是追加写入的修改日志，每条记录带CRC并在写入后 fsync，
+    加载时在快照上重放日志；崩溃时最多丢失最后一条未写完的记录。
+    日志增长到与快照相当时合并成新快照（先原子替换快照，再原子替换为空日志，
+    两个文件用快照代数关联，代数不一致的日志会被忽略）
+    """
+
+    def __init__(self, base_path, min_compact_bytes=64 * 1024):
+        """
+        Args:
+            base_path: 不含扩展名的文件路径
+            min_compact_bytes: 日志小于该大小时不合并
+        """
+        self.snapshot_path = base_path + '.bin'
+        self.journal_path = base_path + '.journal'
+        self.min_compact_bytes = min_compact_bytes
+        self.generation = 0
+        self.snapshot_bytes = 0
+        self.journal_bytes = 0
+        self._journal_end = None      # 日志中最后一条完整记录的结束位置，None表示日志需要重建
+        self._file = None
+
+    @property
+    def active(self):
+        return self._file is not None
+
+    def load(self):
+        """
+        读取快照并重放日志
+        Returns:
+            [(x, y), ...]；快照和日志都不存在时返回None
+        """
+        if not os.path.exists(self.snapshot_path):
+            # 还没有合并过快照，只有日志（首次使用后崩溃）
+            self.generation = 0
+            self.snapshot_bytes = 0
+            points = []
+            self._replay(points)
+            return points if self._journal_end is not None else None
+        with open(self.snapshot_path, 'rb') as f:
+            data = f.read()
+        magic, version, generation = _HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"无法识别的坐标文件: {self.snapshot_path}")
+        (count,) = _COUNT.unpack_from(data, _HEADER.size)
+        start = _HEADER.size + _COUNT.size
+        payload = data[start:start + 8 * count]
+        (crc,) = _CRC.unpack_from(data, start + 8 * count)
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"坐标文件校验失败: {self.snapshot_path}")
+        self.generation = generation
+        self.snapshot_bytes = len(data)
+        points = _unpack_points(payload, count)
+        self._replay(points)
+        return points
+
+    def _replay(self, points):
+        """在 points 上重放日志，记录最后一条完整记录的位置"""
+        self._journal_end = None
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'rb') as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            return
+        magic, version, generation = _HEADER.unpack_from(data)
+        if magic != JOURNAL_MAGIC or version != FORMAT_VERSION or generation != self.generation:
+            return  # 合并快照时中断留下的旧日志，内容已包含在快照中
+
+        offset = _HEADER.size
+        records = 0
+        while offset + _RECORD.size <= len(data):
+            index, removed, count = _RECORD.unpack_from(data, offset)
+            end = offset + _RECORD.size + 8 * count
+            if end + _CRC.size > len(data):
+                break
+            (crc,) = _CRC.unpack_from(data, end)
+            if zlib.crc32(data[offset:end]) != crc:
+                break
+            points[index:index + removed] = _unpack_points(data[offset + _RECORD.size:end], count)
+            offset = end + _CRC.size
+            records += 1
+        if offset < len(data):
+            log.warning("坐标日志末尾不完整，已丢弃", path=self.journal_path, bytes=len(data) - offset)
+        self._journal_end = offset
+        self.journal_bytes = offset
+        log.debug("重放坐标日志", records=records)
+
+    def open(self):
+        """打开日志用于追加；日志不存在、已损坏或属于旧快照时重新创建"""
+        if self._journal_end is None:
+            atomic_write(self.journal_path, _HEADER.pack(JOURNAL_MAGIC, FORMAT_VERSION, self.generation))
+            self._journal_end = _HEADER.size
+            self.journal_bytes = _HEADER.size
+        self._file = open(self.journal_path, 'r+b')
+        self._file.truncate(self._journal_end)   # 去掉崩溃时写了一半的记录
+        self._file.seek(self._journal_end)
+
+    def append(self, changes):
+        """
+        把一次操作的全部修改记录一次写入并 fsync
+        Args:
+            changes: [(序号, 删除数量, 插入的坐标列表), ...]
+        """
+        data = bytearray()
+        for index, removed, points in changes:
+            record = _RECORD.pack(index, removed, len(points)) + _pack_points(points)
+            data += record + _CRC.pack(zlib.crc32(record))
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.journal_bytes += len(data)
+        self._journal_end = self.journal_bytes
+
+    def should_compact(self):
+        return self.journal_bytes > max(self.min_compact_bytes, self.snapshot_bytes)
+
+    def checkpoint(self, points):
+        """把当前全部坐标写成新快照，并换成空日志"""
+        was_open = self.active
+        self.close()
+        payload = _pack_points(points)
+        generation = self.generation + 1
+        data = (_HEADER.pack(SNAPSHOT_MAGIC, FORMAT_VERSION, generation) + _COUNT.pack(len(points)) +
+                payload + _CRC.pack(zlib.crc32(payload)))
+        atomic_write(self.snapshot_path, data)
+        self.generation = generation
+        self.snapshot_bytes = len(data)
+        self._journal_end = None
+        if was_open:
+            self.open()
+
+    def quarantine(self):
+        """把无法读取的快照和日志改名为 .corrupt 保留下来，之后从空白开始"""
+        self.close()
+        for path in (self.snapshot_path, self.journal_path):
+            if os.path.exists(path):
+                os.replace(path, path + '.corrupt')
+        self.generation = 0
+        self.snapshot_bytes = 0
+        self._journal_end = None
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
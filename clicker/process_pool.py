@@ -0,0 +1,320 @@
+import multiprocessing
+import os
+import queue
+import secrets
+import signal
+import threading
+import time
+from array import array
+from multiprocessing import shared_memory
+
+from event_log import log, DEBUG
+from click_pipeline import click_worker_count, replay_group
+from click_plan import GroupPlan
+from input_backend import MOVE, create_backend
+from instrumentation import EVENT, ROUND_START, ROUND_END
+
+# 控制块（int64数组）中的字段
+_COMMAND = 0
+_START_NS = 1
+_GENERATION = 2
+_CONTROL_FIELDS = 3       # 之后每个工作进程一个状态字段：上一条命令是否出错
+
+# 工作进程命令
+_STOP = 0
+_WARM_UP = 1
+_RUN = 2
+
+# 计划头部：每个分片4个int64 —— 事件区位置, 事件数, 时间戳区位置, 批数
+_SHARD_FIELDS = 4
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+class _StampWriter:
+    """代替 Timeline 传给 replay_group，把每批事件的实际提交时刻写入共享内存"""
+
+    __slots__ = ('stamps', 'count')
+
+    def __init__(self, stamps):
+        self.stamps = stamps
+        self.count = 0
+
+    def record(self, kind, stamp_ns, planned_ns=0, aux=0):
+        self.stamps[self.count] = stamp_ns
+        self.count += 1
+
+
+def _load_shard(buf, index):
+    """
+    从共享内存中读取分片 index 的事件计划
+    Returns:
+        (GroupPlan, 时间戳区的可写视图)；分片为空时返回 (None, None)
+    """
+    header = buf[:8 * _SHARD_FIELDS * (index + 1)].cast('q')
+    pos, count, stamps_pos, batches = header[_SHARD_FIELDS * index:_SHARD_FIELDS * (index + 1)]
+    header.release()
+    if not count:
+        return None, None
+    offsets, xs, ys, actions = array('q'), array('i'), array('i'), array('b')
+    offsets.frombytes(buf[pos:pos + 8 * count])
+    pos += 8 * count
+    xs.frombytes(buf[pos:pos + 4 * count])
+    pos += 4 * count
+    ys.frombytes(buf[pos:pos + 4 * count])
+    pos += 4 * count
+    actions.frombytes(buf[pos:pos + count])
+    indices = array('i', [-1]) * actions.count(MOVE)   # 点击日志由主进程输出
+    return GroupPlan(offsets, xs, ys, actions, indices), buf[stamps_pos:stamps_pos + 8 * batches].cast('q')
+
+
+def _worker_main(index, prefix, backend_name, go, done, errors):
+    """
+    工作进程入口：常驻等待命令，始终只回放自己的分片
+    计划在代数变化时从共享内存读取一次，之后每轮只读控制块中的开始时刻
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C 由主进程处理
+    control = shared_memory.SharedMemory(prefix + 'c')
+    fields = control.buf.cast('q')
+    plan_shm = None
+    generation = 0
+    group = stamps = None
+    backend = None
+    backend_error = None
+    try:
+        backend = create_backend(backend_name)
+    except Exception as e:
+        backend_error = str(e)   # 每条命令都报告这一错误，预热因此失败
+
+    while True:
+        go.acquire()
+        command = fields[_COMMAND]
+        try:
+            if command == _STOP:
+                break
+            if fields[_GENERATION] != generation:
+                # 切换到新计划：先释放旧视图再关闭旧的共享内存
+                if stamps is not None:
+                    stamps.release()
+                group = stamps = None
+                if plan_shm is not None:
+                    plan_shm.close()
+                generation = fields[_GENERATION]
+                plan_shm = shared_memory.SharedMemory(f"{prefix}p{generation}")
+                group, stamps = _load_shard(plan_shm.buf, index)
+            if backend is None:
+                raise RuntimeError(f"创建输入后端失败: {backend_error}")
+            if command == _WARM_UP:
+                backend.warm_up()
+            elif command == _RUN and group is not None:
+                replay_group(group, backend, fields[_START_NS], _StampWriter(stamps), index)
+            fields[_CONTROL_FIELDS + index] = 0
+        except Exception as e:
+            fields[_CONTROL_FIELDS + index] = 1
+            errors.put((index, str(e)))
+        finally:
+            done.release()
+
+    if stamps is not None:
+        stamps.release()
+    if plan_shm is not None:
+        plan_shm.close()
+    fields.release()
+    control.close()
+    if backend is not None:
+        backend.close()
+
+
+class ProcessClickPool:
+    """
+    多进程点击执行器
+    每个工作进程固定负责计划中的一个分片，自己创建输入后端，不受主进程GIL影响；
+    编译好的计划（事件时间偏移、坐标、类型）写入共享内存，计划不变时各轮之间不传输任何数据，
+    每轮只在控制块中写入开始时刻并用信号量唤醒各进程；
+    各批事件的实际提交时刻写回共享内存，由主进程在一轮结束后记入时间线
+    接口与 ClickWorkerPool 相同
+    """
+
+    def __init__(self, backend_name='auto', workers=None):
+        """
+        Args:
+            backend_name: 输入后端名称，由各工作进程各自创建
+            workers: 工作进程数，默认按CPU核心数计算
+        """
+        self.backend_name = backend_name
+        self.size = workers or click_worker_count()
+        self._context = multiprocessing.get_context('spawn')   # 各平台行为一致，不继承主进程的线程
+        self._prefix = f"clk{os.getpid()}{secrets.token_hex(2)}"
+        self._processes = []
+        self._control = None
+        self._fields = None
+        self._plan_shm = None
+        self._stamps = []                 # 各分片时间戳区的视图
+        self._groups = None               # 当前写入共享内存的计划
+        self._generation = 0
+        self._go = [self._context.Semaphore(0) for _ in range(self.size)]
+        self._done = self._context.Semaphore(0)
+        self._errors = self._context.Queue()
+        self._round_lock = threading.Lock()   # 同一时刻只允许一轮点击在执行
+
+    def start(self):
+        """创建控制块并启动工作进程；已启动时只重新启动意外退出的进程"""
+        if self._control is None:
+            self._control = shared_memory.SharedMemory(self._prefix + 'c', create=True,
+                                                       size=8 * (_CONTROL_FIELDS + self.size))
+            self._fields = self._control.buf.cast('q')
+            self._processes = [None] * self.size
+        started = 0
+        for i, p in enumerate(self._processes):
+            if p is not None and p.is_alive():
+                continue
+            if p is not None:
+                log.warning("点击进程意外退出，重新启动", process=i + 1, exitcode=p.exitcode)
+            while self._go[i].acquire(block=False):
+                pass   # 丢弃发给已退出进程的命令
+            p = self._context.Process(target=_worker_main, daemon=True, name=f"Shard-{i+1}",
+                                      args=(i, self._prefix, self.backend_name, self._go[i],
+                                            self._done, self._errors))
+            p.start()
+            self._processes[i] = p
+            started += 1
+        if started:
+            log.info("点击进程已启动", processes=started, backend=self.backend_name)
+
+    def _publish(self, groups):
+        """把计划写入新的共享内存块（计划未变化时不做任何事）"""
+        if groups is self._groups:
+            return
+        header_size = 8 * _SHARD_FIELDS * self.size
+        header = array('q', bytes(header_size))
+        pos = header_size
+        for i, group in enumerate(groups):
+            count = len(group)
+            stamps_pos = _align(pos + 17 * count)        # 8(偏移) + 4(x) + 4(y) + 1(类型)
+            header[_SHARD_FIELDS * i:_SHARD_FIELDS * (i + 1)] = array('q', [pos, count, stamps_pos,
+                                                                             len(group.batch_offsets)])
+            pos = stamps_pos + 8 * len(group.batch_offsets)
+
+        self._generation += 1
+        shm = shared_memory.SharedMemory(f"{self._prefix}p{self._generation}", create=True, size=max(8, pos))
+        buf = shm.buf
+        buf[:header_size] = header.tobytes()
+        stamps = []
+        for i, group in enumerate(groups):
+            pos, count, stamps_pos, batches = header[_SHARD_FIELDS * i:_SHARD_FIELDS * (i + 1)]
+            for data in (group.offsets, group.xs, group.ys, group.actions):
+                raw = data.tobytes()
+                buf[pos:pos + len(raw)] = raw
+                pos += len(raw)
+            stamps.append(buf[stamps_pos:stamps_pos + 8 * batches].cast('q'))
+
+        self._release_plan()
+        self._plan_shm = shm
+        self._stamps = stamps
+        self._groups = groups
+        self._fields[_GENERATION] = self._generation
+        log.debug("点击计划已写入共享内存", generation=self._generation, bytes=shm.size)
+
+    def _release_plan(self):
+        """主进程不再需要旧计划：各工作进程在下一条命令时会切换到新计划"""
+        for view in self._stamps:
+            view.release()
+        self._stamps = []
+        if self._plan_shm is not None:
+            self._plan_shm.close()
+            self._plan_shm.unlink()
+            self._plan_shm = None
+
+    def _command(self, command):
+        """
+        向所有工作进程发出命令并等待全部完成
+        Returns:
+            本条命令出错的进程序号列表
+        Raises:
+            RuntimeError: 有工作进程意外退出
+        """
+        while self._done.acquire(block=False):
+            pass   # 上一条命令因进程退出而中断时残留的完成信号
+        self._fields[_COMMAND] = command
+        for go in self._go:
+            go.release()
+        for _ in self._go:
+            while not self._done.acquire(timeout=1.0):
+                if not all(p.is_alive() for p in self._processes):
+                    raise RuntimeError("点击进程意外退出")
+        failed = [i for i in range(self.size) if self._fields[_CONTROL_FIELDS + i]]
+        for _ in failed:
+            try:
+                index, error = self._errors.get(timeout=0.5)   # 出错信息经队列异步送达
+            except queue.Empty:
+                break
+            log.error("点击执行出错", process=index + 1, error=error)
+        return failed
+
+    def warm_up(self, groups=()):
+        """
+        预热：把计划写入共享内存，并让各进程读取分片、初始化输入后端
+        Args:
+            groups: 即将执行的 ClickPlan.groups
+        Raises:
+            RuntimeError: 有工作进程无法初始化输入后端或已退出
+        """
+        with self._round_lock:
+            self._publish(groups)
+            failed = self._command(_WARM_UP)
+        if failed:
+            raise RuntimeError(f"点击进程预热失败: {', '.join(str(i + 1) for i in failed)}")
+
+    def run_round(self, groups, timeline=None):
+        """
+        执行一轮点击：各进程以同一时刻为基准回放自己的分片，全部完成后返回
+        Args:
+            groups: ClickPlan.groups，组数不超过进程数
+            timeline: 记录本轮时间线的 Timeline，为None时不记录
+        """
+        with self._round_lock:
+            self._publish(groups)
+            start_ns = time.perf_counter_ns()
+            self._fields[_START_NS] = start_ns
+            self._command(_RUN)
+            end_ns = time.perf_counter_ns()
+            if timeline is not None:
+                timeline.record(ROUND_START, start_ns)
+                for i, (group, stamps) in enumerate(zip(groups, self._stamps)):
+                    for stamp, offset, events in zip(stamps, group.batch_offsets, group.batches):
+                        if stamp >= start_ns:     # 出错时未写入的批次保留上一轮的旧值
+                            timeline.record(EVENT, stamp, start_ns + offset, i << 16 | len(events))
+                timeline.record(ROUND_END, end_ns)
+            if log.enabled(DEBUG):
+                for group in groups:
+                    for labels in group.labels:
+                        for index, x, y in labels:
+                            log.debug("双击坐标", index=index + 1, x=x, y=y)
+
+    def shutdown(self):
+        """结束所有工作进程"""
+        if self._control is None:
+            return
+        self._fields[_COMMAND] = _STOP
+        for go in self._go:
+            go.release()
+        for p in self._processes:
+            if p is None:
+                continue
+            p.join(timeout=2)
+            if p.is_alive():
+                p.terminate()
+        self._processes = [None] * self.size
+
+    def close(self):
+        """结束工作进程并释放共享内存（输入后端由各进程退出时关闭）"""
+        self.shutdown()
+        self._release_plan()
+        self._groups = None
+        if self._control is not None:
+            self._fields.release()
+            self._control.close()
+            self._control.unlink()
+            self._control = None
@@ -0,0 +1,90 @@
+import threading
+
+import keyboard
+
+from event_log import log
+
+
+class HotkeyRecorder:
+    """
+    事件驱动的坐标录制器
+    在 keyboard 的按键回调中直接读取鼠标位置，记录的是按下那一刻的坐标，不需要轮询线程；
+    按住录制键时按 stream_hz 的频率连续采集，松开即停止
+    """
+
+    def __init__(self, on_point, on_stop=None, record_key='F9', stop_key='F8', stream_hz=10, position=None):
+        """
+        Args:
+            on_point: 采集到坐标时调用 on_point(x, y)，在 keyboard 的回调线程中执行
+            on_stop: 按下停止键时调用
+            record_key: 录制键
+            stop_key: 停止键
+            stream_hz: 按住录制键时每秒采集次数，0 表示每次按下只采集一个坐标
+            position: 返回当前鼠标位置 (x, y) 的函数，默认使用 pyautogui.position
+        """
+        self.on_point = on_point
+        self.on_stop = on_stop
+        self.record_key = record_key
+        self.stop_key = stop_key
+        self.stream_hz = stream_hz
+        self.position = position
+        self.active = False
+        self._hooks = []
+        self._released = threading.Event()   # 录制键已松开
+        self._released.set()
+
+    def start(self):
+        """注册按键回调，开始录制"""
+        if self.active:
+            return
+        if self.position is None:
+            import pyautogui  # 只有录制坐标时才需要，不拖慢启动
+            self.position = pyautogui.position
+        self._released.set()
+        self._hooks = [
+            keyboard.on_press_key(self.record_key, self._on_record_press),
+            keyboard.on_release_key(self.record_key, self._on_record_release),
+            keyboard.on_press_key(self.stop_key, self._on_stop_press)
+        ]
+        self.active = True
+
+    def stop(self):
+        """注销按键回调，停止录制"""
+        if not self.active:
+            return
+        self.active = False
+        self._released.set()
+        for hook in self._hooks:
+            keyboard.unhook(hook)
+        self._hooks = []
+
+    def capture(self):
+        """读取当前鼠标位置并交给 on_point"""
+        x, y = self.position()
+        self.on_point(x, y)
+
+    def _on_record_press(self, event):
+        # 按住时系统会重复发送按下事件，只处理第一次
+        if not self.active or not self._released.is_set():
+            return
+        self._released.clear()
+        self.capture()
+        if self.stream_hz > 0:
+            threading.Thread(target=self._stream, daemon=True, name="RecordStream").start()
+
+    def _on_record_release(self, event):
+        self._released.set()
+
+    def _on_stop_press(self, event):
+        if self.active and self.on_stop is not None:
+            self.on_stop()
+
+    def _stream(self):
+        """按住录制键期间按固定频率采集，松开或停止录制后结束"""
+        interval = 1 / self.stream_hz
+        while not self._released.wait(interval):
+            try:
+                self.capture()
+            except Exception as e:
+                log.error("采集坐标失败", error=str(e))
+                break
@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import threading
+from datetime import datetime, timedelta
+
+WEEKDAY_NAMES = ['一', '二', '三', '四', '五', '六', '日']
+
+
+def parse_time_of_day(text):
+    """
+    解析执行时刻
+    Args:
+        text: "HH:MM"、"HH:MM:SS" 或 "HH:MM:SS.mmm"
+    Returns:
+        (时, 分, 秒, 微秒)
+    """
+    main, _, frac = text.strip().partition('.')
+    parts = [int(p) for p in main.split(':')]
+    if len(parts) == 2:
+        parts.append(0)
+    if len(parts) != 3:
+        raise ValueError(f"无效的时间格式: {text}")
+    hour, minute, second = parts
+    if frac and (not frac.isdigit() or len(frac) > 3):
+        raise ValueError(f"无效的毫秒: {text}")
+    ms = int(frac.ljust(3, '0')) if frac else 0
+    if not (0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= second <= 59):
+        raise ValueError(f"无效的时间: {text}")
+    return hour, minute, second, ms * 1000
+
+
+class Job:
+    """
+    定时任务
+    每个任务有自己的执行时刻（精确到毫秒）、重复规则以及坐标和点击设置
+    """
+
+    def __init__(self, name, time_of_day="20:00:00.000", date=None, weekdays=None,
+                 coordinates=None, click_interval=None, enabled=True):
+        """
+        Args:
+            name: 任务名称（唯一）
+            time_of_day: 执行时刻 "HH:MM:SS.mmm"
+            date: 只执行一次的日期 "YYYY-MM-DD"，为None时按天重复
+            weekdays: 重复的星期列表（0=周一 ... 6=周日），为空时每天执行
+            coordinates: 任务专用坐标列表，为None时使用当前记录的坐标
+            click_interval: 任务专用点击间隔(秒)，为None时使用全局设置
+            enabled: 是否启用
+        """
+        self.name = name
+        self.time_parts = parse_time_of_day(time_of_day)
+        self.date = datetime.strptime(date, "%Y-%m-%d").date() if date else None
+        self.weekdays = sorted(set(weekdays or []))
+        self.coordinates = [tuple(c) for c in coordinates] if coordinates is not None else None
+        self.click_interval = click_interval
+        self.enabled = enabled
+
+    @property
+    def time_of_day(self):
+        hour, minute, second, us = self.time_parts
+        return f"{hour:02d}:{minute:02d}:{second:02d}.{us // 1000:03d}"
+
+    def describe_recurrence(self):
+        """重复规则的文字描述"""
+        if self.date:
+            return self.date.strftime("%Y-%m-%d")
+        if not self.weekdays or len(self.weekdays) == 7:
+            return "每天"
+        return "每周" + "".join(WEEKDAY_NAMES[d] for d in self.weekdays)
+
+    def next_run_after(self, current_time):
+        """
+        计算严格晚于 current_time 的下一次执行时刻
+        Returns:
+            datetime，没有后续执行（已禁用或一次性任务已过期）时返回None
+        """
+        if not self.enabled:
+            return None
+        hour, minute, second, us = self.time_parts
+        if self.date:
+            run = datetime.combine(self.date, datetime.min.time()).replace(
+                hour=hour, minute=minute, second=second, microsecond=us)
+            return run if run > current_time else None
+
+        day = current_time.replace(hour=hour, minute=minute, second=second, microsecond=us)
+        for _ in range(8):
+            if day > current_time and (not self.weekdays or day.weekday() in self.weekdays):
+                return day
+            day = day + timedelta(days=1)
+        return None
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'time': self.time_of_day,
+            'date': self.date.strftime("%Y-%m-%d") if self.date else None,
+            'weekdays': self.weekdays,
+            'coordinates': self.coordinates,
+            'click_interval': self.click_interval,
+            'enabled': self.enabled
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['name'],
+            data.get('time', "20:00:00.000"),
+            date=data.get('date'),
+            weekdays=data.get('weekdays'),
+            coordinates=data.get('coordinates'),
+            click_interval=data.get('click_interval'),
+            enabled=data.get('enabled', True)
+        )
+
+
+class JobScheduler:
+    """
+    多任务调度器
+    用最小堆保存各任务的下一次执行时刻，取最近的任务只需查看堆顶
+    """
+
+    def __init__(self, clock):
+        """
+        Args:
+            clock: ClockSync 实例，用于网络时间与截止时刻的换算
+        """
+        self.clock = clock
+        self.jobs = {}                    # 名称 -> Job
+        self._heap = []                   # [(截止时刻us, 序号, 任务名), ...]
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.on_change = None             # 任务变化时的回调（用于让触发器重新计算目标）
+
+    def set_jobs(self, jobs):
+        """整体替换任务列表"""
+        with self._lock:
+            self.jobs = {job.name: job for job in jobs}
+        self.rebuild()
+
+    def add_job(self, job):
+        """添加或替换同名任务"""
+        with self._lock:
+            self.jobs[job.name] = job
+        self.rebuild()
+
+    def remove_job(self, name):
+        with self._lock:
+            self.jobs.pop(name, None)
+        self.rebuild()
+
+    def rebuild(self):
+        """按当前网络时间重新计算所有任务的下一次执行时刻"""
+        current_time = self.clock.now()
+        with self._lock:
+            self._heap = []
+            for job in self.jobs.values():
+                self._push(job, current_time)
+        if self.on_change is not None:
+            self.on_change()
+
+    def _push(self, job, after):
+        run = job.next_run_after(after)
+        if run is not None:
+            heapq.heappush(self._heap, (self.clock.to_us(run), next(self._counter), job.name))
+
+    def peek(self):
+        """
+        最近一次待执行的任务
+        Returns:
+            (截止时刻us, Job)，没有待执行任务时返回None
+        """
+        with self._lock:
+            while self._heap:
+                deadline_us, _, name = self._heap[0]
+                job = self.jobs.get(name)
+                if job is not None:
+                    return deadline_us, job
+                heapq.heappop(self._heap)  # 任务已被删除
+            return None
+
+    def complete(self, job, deadline_us):
+        """任务已触发：弹出堆顶并排入该任务的下一次执行"""
+        with self._lock:
+            if self._heap and self._heap[0][2] == job.name and self._heap[0][0] == deadline_us:
+                heapq.heappop(self._heap)
+                self._push(job, self.clock.from_us(deadline_us))
@@ -0,0 +1,134 @@
+import os
+import socket
+import struct
+import threading
+from urllib.parse import urlsplit
+
+NTP_PORT = 123
+NTP_EPOCH_OFFSET = 2208988800          # 1900-01-01 到 1970-01-01 的秒数
+NTP_ERA_US = (1 << 32) * 1_000_000     # NTP秒字段每 2^32 秒回绕一次（2036年）
+MODE_CLIENT = 3
+MODE_SERVER = 4
+LEAP_UNSYNCHRONIZED = 3
+RETRY_TIMEOUT_FACTOR = 4               # 首次应答之后，单次查询超时取首次往返时延的倍数
+MIN_RETRY_TIMEOUT = 0.2                # 首次应答之后的单次查询超时下限(秒)
+
+# LI/VN/Mode, 层级, 轮询间隔, 精度, 根延迟, 根离散度, 参考ID, 参考/起始/接收/发送时间戳
+_PACKET = struct.Struct('!BBbbIII4Q')
+
+
+def is_ntp_url(url):
+    return url.startswith('ntp://')
+
+
+def ntp_to_us(timestamp, near_us):
+    """
+    64位NTP时间戳转换为Unix纪元微秒
+    NTP秒字段会回绕，取与 near_us（本地时间）最接近的纪元
+    """
+    us = ((timestamp >> 32) - NTP_EPOCH_OFFSET) * 1_000_000 + ((timestamp & 0xFFFFFFFF) * 1_000_000 >> 32)
+    return us + round((near_us - us) / NTP_ERA_US) * NTP_ERA_US
+
+
+def short_to_us(value):
+    """NTP 16.16 定点格式（根延迟、根离散度）转换为微秒"""
+    return value * 1_000_000 >> 16
+
+
+class SntpConnection:
+    """
+    到单个SNTP服务器的UDP"连接"
+    地址解析和套接字创建在计时之外完成；每次查询发送一个客户端报文，
+    用四个时间戳计算偏移和往返时延：
+        偏移 = ((T2 - T1) + (T3 - T4)) / 2
+        时延 = (T4 - T1) - (T3 - T2)
+    接口与 TimeServerConnection 相同（url、conn、lock、connect()、close()）
+    """
+
+    def __init__(self, url, timeout=2):
+        parts = urlsplit(url)
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or NTP_PORT
+        self.timeout = timeout
+        self.conn = None                  # 已 connect() 到服务器地址的UDP套接字
+        self.lock = threading.Lock()      # 同一套接字上的查询必须串行
+
+    def connect(self):
+        """解析服务器地址并创建UDP套接字"""
+        self.close()
+        family, kind, proto, _, address = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_DGRAM)[0]
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(self.timeout)
+        sock.connect(address)
+        self.conn = sock
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _query(self, clock, timeout):
+        # 发送时间戳字段填随机数（RFC 9109），服务器原样放入起始时间戳，用于丢弃过期或伪造的应答
+        nonce = int.from_bytes(os.urandom(8), 'big')
+        request = _PACKET.pack(4 << 3 | MODE_CLIENT, 0, 0, 0, 0, 0, 0, 0, 0, 0, nonce)
+        self.conn.settimeout(timeout)
+        t1 = clock()
+        self.conn.send(request)
+        while True:
+            data = self.conn.recv(512)
+            t4 = clock()
+            if len(data) >= _PACKET.size and _PACKET.unpack_from(data)[8] == nonce:
+                break
+        (flags, stratum, _, precision, root_delay, root_dispersion, _,
+         _, _, receive, transmit) = _PACKET.unpack_from(data)
+        if flags & 0x7 != MODE_SERVER:
+            raise ValueError("不是NTP服务器应答")
+        if stratum == 0 or stratum > 15 or flags >> 6 == LEAP_UNSYNCHRONIZED or not transmit:
+            raise ValueError(f"服务器时钟未同步 (stratum={stratum})")
+        t2 = ntp_to_us(receive, t1)
+        t3 = ntp_to_us(transmit, t4)
+        # 服务器自身到参考源的不确定度：根延迟的一半加根离散度，再加时钟精度
+        server_error = short_to_us(root_delay) / 2 + short_to_us(root_dispersion) + 2.0 ** precision * 1_000_000
+        return t1, t2, t3, t4, server_error
+
+    def query(self, clock, timeout=None):
+        """
+        发送一次SNTP查询
+        Args:
+            clock: 返回本地时间戳(us)的函数
+            timeout: 本次查询的超时时间(秒)，默认使用 self.timeout
+        Returns:
+            (T1, T2, T3, T4, 服务器误差us)，T1/T4为本地时间，T2/T3为服务器时间
+        """
+        with self.lock:
+            if self.conn is None:
+                self.connect()
+            return self._query(clock, timeout or self.timeout)
+
+    def sample(self, clock, count=4):
+        """
+        连续查询多次，取往返时延最小的一次（时延越小，路径不对称带来的误差越小）
+        首次查询超时视为UDP不通，直接报错；之后的查询按首次往返时延缩短超时，丢包只跳过
+        Returns:
+            (本地中点us, 偏移us, 往返时延us, 误差界us)
+        """
+        results = []
+        timeout = None
+        for i in range(count):
+            try:
+                results.append(self.query(clock, timeout))
+            except socket.timeout:
+                if i == 0:
+                    raise
+                continue
+            if timeout is None:
+                t1, _, _, t4, _ = results[0]
+                timeout = min(self.timeout, max(MIN_RETRY_TIMEOUT, RETRY_TIMEOUT_FACTOR * (t4 - t1) / 1_000_000))
+        if not results:
+            raise socket.timeout("SNTP查询全部超时")
+        delay, t1, t2, t3, t4, server_error = min(
+            ((t4 - t1) - (t3 - t2), t1, t2, t3, t4, server_error) for t1, t2, t3, t4, server_error in results)
+        delay = max(0, delay)
+        offset = ((t2 - t1) + (t3 - t4)) / 2
+        return t1 + (t4 - t1) // 2, offset, delay, delay / 2 + server_error
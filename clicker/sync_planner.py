@@ -0,0 +1,96 @@
+import time
+
+
+class SyncPlanner:
+    """
+    时钟同步计划
+    根据下一个截止时刻和当前误差估计决定何时采样：离截止时刻越近采样越密（每次间隔为剩余时间的1/4），
+    预计误差已经足够小时跳过中间采样；最后一次同步安排在预热开始之前完成，
+    之后直到执行结束都不再访问网络，没有任务时只低频维持漂移估计
+    """
+
+    def __init__(self, clock, lead_s=6.0, target_error_us=2000, min_interval=2.0,
+                 idle_interval=600.0, retry_max=30.0):
+        """
+        Args:
+            clock: ClockSync 实例
+            lead_s: 最后一次同步至少在截止时刻前多少秒完成（应大于预热提前量）
+            target_error_us: 截止时刻的期望误差界(微秒)
+            min_interval: 两次同步之间的最短间隔(秒)
+            idle_interval: 没有临近任务时的同步间隔(秒)
+            retry_max: 同步失败后重试间隔的上限(秒)
+        """
+        self.clock = clock
+        self.lead_s = lead_s
+        self.target_error_us = target_error_us
+        self.min_interval = min_interval
+        self.idle_interval = idle_interval
+        self.retry_max = retry_max
+        self.failures = 0                 # 连续失败次数
+        self.last_sync_at = None          # 最近一次同步开始的 perf_counter 时刻
+        self.last_duration = 0.0          # 最近一次同步耗时(秒)
+        self._planned = None              # 本次同步针对的 (截止时刻us, 开始时的剩余秒数)
+        self._final = None                # 已完成最后一次同步的截止时刻us
+
+    def next_delay(self, deadline_us=None, busy=False):
+        """
+        距下一次同步的秒数，0表示应立即同步
+        Args:
+            deadline_us: 下一个截止时刻（网络时间us），没有任务时为None
+            busy: 是否正在执行点击（执行期间不做网络I/O）
+        """
+        since = time.perf_counter() - self.last_sync_at if self.last_sync_at is not None else float('inf')
+        self._planned = None
+        if busy:
+            return self.min_interval
+
+        if deadline_us is not None:
+            remaining = (deadline_us - self.clock.now_us()) / 1_000_000
+            final_in = remaining - self.lead_s - self.last_duration   # 距最后一次同步应开始的秒数
+            if self.clock.synced and (self._final == deadline_us or final_in < -self.min_interval):
+                # 最后一次同步已完成（或任务加入时已来不及）：预热和触发阶段保持安静，
+                # 截止时刻过后按下一个任务重新规划
+                return max(self.min_interval, remaining + self.min_interval)
+
+        if self.failures or not self.clock.synced:
+            backoff = min(self.retry_max, self.min_interval * 2 ** max(0, self.failures - 1))
+            return self._due(backoff - since, deadline_us, remaining if deadline_us is not None else None)
+
+        if deadline_us is None:
+            return self._due(self.idle_interval - since, None, None)
+
+        if final_in <= 0:
+            return self._due(0, deadline_us, remaining)   # 到了最后一次同步的时刻
+
+        if self.clock.predicted_error_us(deadline_us) <= self.target_error_us:
+            interval = self.idle_interval   # 误差已满足要求，只需要最后一次同步确认
+        else:
+            interval = max(self.min_interval, min(self.idle_interval, remaining / 4))
+        delay = interval - since
+        if final_in - delay < interval / 2:
+            delay = final_in   # 与最后一次同步靠得太近的采样直接合并成最后一次
+        return self._due(delay, deadline_us, remaining)
+
+    def _due(self, delay, deadline_us, remaining):
+        if delay > 0:
+            return delay
+        self._planned = (deadline_us, remaining)
+        return 0
+
+    def record(self, ok, duration_s):
+        """
+        记录一次同步的结果
+        Args:
+            ok: 是否成功
+            duration_s: 同步耗时(秒)
+        """
+        self.last_sync_at = time.perf_counter() - duration_s
+        if not ok:
+            self.failures += 1
+            return
+        self.failures = 0
+        self.last_duration = duration_s
+        if self._planned is not None:
+            deadline_us, remaining = self._planned
+            if remaining is not None and remaining - self.lead_s - duration_s <= self.min_interval:
+                self._final = deadline_us
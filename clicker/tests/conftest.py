@@ -0,0 +1,6 @@
+import os
+import sys
+
+# 各模块按同级模块方式互相导入（与直接运行 clicker.py 时一致）
+CLICKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [CLICKER_DIR, os.path.join(CLICKER_DIR, 'benchmarks')]
@@ -0,0 +1,53 @@
+import time
+
+from clock_sync import ClockSync, marzullo
+from fake_ntp_server import FakeNtpServer
+
+
+def test_all_intervals_overlap():
+    assert marzullo([(0, 10), (2, 8), (4, 12)]) == (3, 4, 8)
+
+
+def test_majority_excludes_outlier():
+    assert marzullo([(0, 10), (5, 15), (100, 110)]) == (2, 5, 10)
+
+
+def test_disjoint_intervals():
+    count, lo, hi = marzullo([(0, 1), (5, 6), (10, 11)])
+    assert count == 1
+    assert (lo, hi) == (0, 1)
+
+
+def test_touching_intervals_intersect():
+    # 同值时区间开始排在结束之前，端点相接视为相交
+    assert marzullo([(0, 5), (5, 10)]) == (2, 5, 5)
+
+
+def test_single_interval():
+    assert marzullo([(-3, 3)]) == (1, -3, 3)
+
+
+def test_old_tight_sample_does_not_pin_offset():
+    clock = ClockSync(servers=[])
+    try:
+        clock.add_sample(0, 0, 1000, 2000)
+        clock.add_sample(600_000_000, 30_000, 4000, 3000)     # 10分钟后，误差界稍大
+        assert clock._model[1] == 30_000
+        clock.add_sample(601_000_000, 30_050, 1000, 2500)     # 时间接近时仍取误差界更小的样本
+        assert clock._model[1] == 30_050
+    finally:
+        clock.close()
+
+
+def test_sync_rejects_falseticker():
+    servers = [FakeNtpServer(offset=0.5).start(), FakeNtpServer(offset=0.5).start(),
+               FakeNtpServer(offset=5.0).start()]
+    clock = ClockSync(servers=[s.url for s in servers])
+    try:
+        assert clock.sync_once()
+        assert abs((clock.now_us() - time.time() * 1_000_000) / 1000 - 500) < 50
+        assert clock.health[servers[2].url] < clock.health[servers[0].url] == 1.0
+    finally:
+        clock.close()
+        for server in servers:
+            server.stop()
@@ -0,0 +1,15 @@
+import pytest
+
+from event_log import EventLog, DEBUG, INFO, WARNING, ERROR
+
+
+@pytest.mark.parametrize('level, expected', [
+    ('DEBUG', DEBUG), ('info', INFO), (' Warning ', WARNING), ('error', ERROR), (WARNING, WARNING),
+    ('verbose', INFO), ('', INFO), (2.5, INFO), (True, INFO),
+])
+def test_configure_level(level, expected):
+    log = EventLog(console=False)
+    log.configure(level=level)
+    assert log.level == expected
+    log.info("记录不会抛出异常")
+    log.error("记录不会抛出异常")
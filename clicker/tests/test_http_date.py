@@ -0,0 +1,60 @@
+import calendar
+from email.utils import formatdate
+
+import pytest
+
+import http_date
+from http_date import parse_http_date, days_from_civil
+
+SECOND_US = 1_000_000
+
+
+@pytest.mark.parametrize('seconds', [
+    0,                  # 1970-01-01
+    784111777,          # 1994-11-06 08:49:37（RFC 7231 中的示例）
+    951782400,          # 2000-02-29 闰日
+    1709251199,         # 2024-02-29 23:59:59
+    1798761600,         # 2027-01-01
+    4107542400,         # 2100-03-01（2100年不是闰年）
+    4294967296,         # 2106-02-07，超出32位秒数
+])
+def test_imf_fixdate_matches_email_utils(seconds):
+    assert parse_http_date(formatdate(seconds, usegmt=True)) == seconds * SECOND_US
+
+
+def test_rfc_example():
+    assert parse_http_date('Sun, 06 Nov 1994 08:49:37 GMT') == 784111777 * SECOND_US
+
+
+def test_days_from_civil():
+    for year, month, day in [(1969, 12, 31), (1970, 1, 1), (2000, 3, 1), (2400, 2, 29), (1600, 1, 1)]:
+        expected = calendar.timegm((year, month, day, 0, 0, 0)) // 86400
+        assert days_from_civil(year, month, day) == expected
+
+
+@pytest.mark.parametrize('value', [
+    'Sunday, 06-Nov-94 08:49:37 GMT',   # RFC 850
+    'Sun Nov  6 08:49:37 1994',         # asctime
+])
+def test_obsolete_formats(value):
+    assert parse_http_date(value) == 784111777 * SECOND_US
+
+
+@pytest.mark.parametrize('value', [
+    '',
+    'not a date',
+    'Sun, 06 Nov 1994 24:49:37 GMT',
+    'Sun, 32 Nov 1994 08:49:37 GMT',
+    'Sun, 06 Nov 1994 08:60:37 GMT',
+])
+def test_invalid_dates_raise(value):
+    with pytest.raises(ValueError):
+        parse_http_date(value)
+
+
+def test_repeated_value_uses_cache(monkeypatch):
+    value = 'Mon, 07 Nov 1994 08:49:37 GMT'
+    first = parse_http_date(value)
+    assert http_date._last == (value, first)
+    monkeypatch.setattr(http_date, 'days_from_civil', None)   # 命中缓存时不会再解析
+    assert parse_http_date(value) == first
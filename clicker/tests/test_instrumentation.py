@@ -0,0 +1,45 @@
+import os
+
+from click_pipeline import ClickWorkerPool
+from engine import ClickerEngine
+from input_backend import create_backend
+from instrumentation import Timeline, TRIGGER, DISPATCH, EVENT
+
+
+def test_headline_stamps_survive_wrap_around():
+    timeline = Timeline(capacity=16)
+    timeline.record(TRIGGER, 1_050_000, 1_000_000)
+    timeline.record(DISPATCH, 1_100_000)
+    for k in range(100):
+        timeline.record(EVENT, 1_300_000 + k * 1000, 1_200_000 + k * 1000)
+    report = timeline.report()
+    assert report['wrapped']
+    assert report['trigger_lateness_us'] == 50
+    assert report['dispatch_lateness_us'] == 100
+    assert report['first_event_lateness_us'] == 300
+
+    timeline.reset()
+    assert timeline.report()['first_event_lateness_us'] is None
+
+
+def test_exports_are_unique_and_capped(tmp_path):
+    timeline = Timeline(capacity=16)
+    paths = [timeline.export(str(tmp_path), keep=3) for _ in range(5)]
+    assert len(set(paths)) == 5
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths[-3:])
+
+
+def test_each_run_has_its_own_timeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = ClickerEngine(coordinates_file=str(tmp_path / 'coordinates.json'),
+                           settings_file=str(tmp_path / 'settings.json'))
+    engine.click_pool = ClickWorkerPool(create_backend('recording'))
+    try:
+        manual = engine.prepare_run([(1, 1)], 0.01)
+        manual.timeline.record(EVENT, 2_000, 1_000)
+        scheduled = engine.prepare_run([(2, 2)], 0.01)   # 手动执行进行中时开始定时任务的预热
+        assert scheduled.timeline is not manual.timeline
+        assert manual.timeline.records() == [(EVENT, 2_000, 1_000, 0)]
+    finally:
+        engine.click_pool.close()
+        engine.clock.close()
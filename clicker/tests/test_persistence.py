@@ -0,0 +1,113 @@
+import os
+
+from coordinate_store import CoordinateStore
+from engine import ClickerEngine
+from persistence import CoordinateJournal
+
+
+def open_store(base, points=()):
+    """创建坐标存储并把每次修改写入日志（与引擎的接法相同）"""
+    journal = CoordinateJournal(base)
+    journal.checkpoint(list(points))
+    journal.open()
+    store = CoordinateStore(points)
+    store.on_change = journal.append
+    return store, journal
+
+
+def test_replay_after_edits(tmp_path):
+    base = str(tmp_path / 'coordinates')
+    store, journal = open_store(base, [(i, i) for i in range(20)])
+    store.extend([(100, 100), (101, 101)])
+    store.delete([1, 3, 4, 5, 10, 21])        # 分散删除：一次通知包含多段修改
+    store.move([0, 2], 8)
+    store.reorder(list(reversed(range(len(store)))))
+    store.insert(3, [(200, 200)])
+    journal.close()
+
+    assert CoordinateJournal(base).load() == store.to_list()
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    base = str(tmp_path / 'coordinates')
+    store, journal = open_store(base, [(1, 1)])
+    store.add(2, 2)
+    store.add(3, 3)
+    journal.close()
+    complete = os.path.getsize(base + '.journal')
+    with open(base + '.journal', 'ab') as f:
+        f.write(b'\x05\x00\x00\x00\x00\x00')   # 崩溃时写了一半的记录
+
+    journal = CoordinateJournal(base)
+    assert journal.load() == [(1, 1), (2, 2), (3, 3)]
+    assert journal.journal_bytes == complete
+    journal.open()
+    assert os.path.getsize(base + '.journal') == complete
+    journal.append([(3, 0, [(4, 4)])])
+    journal.close()
+    assert CoordinateJournal(base).load() == [(1, 1), (2, 2), (3, 3), (4, 4)]
+
+
+def test_corrupt_record_stops_replay(tmp_path):
+    base = str(tmp_path / 'coordinates')
+    store, journal = open_store(base)
+    store.add(1, 1)
+    journal.close()
+    first = os.path.getsize(base + '.journal')
+    journal.open()
+    store.add(2, 2)
+    store.add(3, 3)
+    journal.close()
+    with open(base + '.journal', 'r+b') as f:
+        f.seek(first + 12)              # 第二条记录的坐标数据
+        f.write(b'\xff')
+
+    assert CoordinateJournal(base).load() == [(1, 1)]
+
+
+def test_journal_from_other_generation_is_ignored(tmp_path):
+    base = str(tmp_path / 'coordinates')
+    store, journal = open_store(base, [(1, 1)])
+    store.add(2, 2)
+    journal.close()
+    with open(base + '.journal', 'rb') as f:
+        old_journal = f.read()
+
+    # 合并快照时在替换日志之前崩溃：新快照已包含日志内容，旧日志仍在
+    journal.checkpoint(store.to_list())
+    with open(base + '.journal', 'wb') as f:
+        f.write(old_journal)
+
+    journal = CoordinateJournal(base)
+    assert journal.load() == [(1, 1), (2, 2)]
+    journal.open()
+    journal.append([(2, 0, [(3, 3)])])
+    journal.close()
+    assert CoordinateJournal(base).load() == [(1, 1), (2, 2), (3, 3)]
+
+
+def test_corrupt_snapshot_is_quarantined(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    base = str(tmp_path / 'coordinates')
+    store, journal = open_store(base, [(1, 1), (2, 2)])
+    journal.close()
+    with open(base + '.bin', 'r+b') as f:
+        f.seek(-6, os.SEEK_END)         # 快照末尾的坐标数据
+        f.write(b'\x00\xff')
+
+    engine = ClickerEngine(coordinates_file=str(tmp_path / 'coordinates.json'),
+                           settings_file=str(tmp_path / 'settings.json'))
+    try:
+        engine.load_coordinates()
+        assert len(engine.coordinates) == 0
+        assert os.path.exists(base + '.bin.corrupt')
+        assert os.path.exists(base + '.journal.corrupt')
+        assert not os.path.exists(base + '.bin')
+
+        # 之后的修改写入新的日志，重新加载后仍在
+        engine.add_coordinate(5, 5)
+        engine.journal.close()
+        assert CoordinateJournal(base).load() == [(5, 5)]
+    finally:
+        engine.journal.close()
+        engine.clock.close()
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+
+from scheduler import Job, parse_time_of_day
+
+# 2026-10-17 是周六
+SATURDAY = datetime(2026, 10, 17, 12, 0, 0)
+
+
+def test_parse_time_of_day():
+    assert parse_time_of_day("20:00") == (20, 0, 0, 0)
+    assert parse_time_of_day("08:30:15") == (8, 30, 15, 0)
+    assert parse_time_of_day("08:30:15.5") == (8, 30, 15, 500_000)
+    assert parse_time_of_day("08:30:15.025") == (8, 30, 15, 25_000)
+
+
+@pytest.mark.parametrize('text', ["24:00", "12:60", "12:00:00.1234", "12:00:00.x", "12"])
+def test_parse_time_of_day_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_time_of_day(text)
+
+
+def test_daily_later_today():
+    job = Job("每天", "20:00:00.250")
+    assert job.next_run_after(SATURDAY) == datetime(2026, 10, 17, 20, 0, 0, 250_000)
+
+
+def test_daily_already_passed_runs_tomorrow():
+    job = Job("每天", "09:00")
+    assert job.next_run_after(SATURDAY) == datetime(2026, 10, 18, 9, 0)
+
+
+def test_next_run_is_strictly_after():
+    job = Job("每天", "12:00")
+    assert job.next_run_after(SATURDAY) == datetime(2026, 10, 18, 12, 0)
+
+
+def test_weekdays_skip_to_next_allowed_day():
+    job = Job("工作日", "09:00", weekdays=[0, 1, 2, 3, 4])
+    assert job.next_run_after(SATURDAY) == datetime(2026, 10, 19, 9, 0)   # 周一
+
+
+def test_weekly_same_day_already_passed_runs_next_week():
+    job = Job("每周六", "09:00", weekdays=[5])
+    assert job.next_run_after(SATURDAY) == datetime(2026, 10, 24, 9, 0)
+
+
+def test_one_shot_date():
+    job = Job("一次", "20:00", date="2026-10-20")
+    assert job.next_run_after(SATURDAY) == datetime(2026, 10, 20, 20, 0)
+    assert job.next_run_after(datetime(2026, 10, 20, 20, 0)) is None
+
+
+def test_disabled_job_never_runs():
+    job = Job("禁用", "20:00", enabled=False)
+    assert job.next_run_after(SATURDAY) is None
+
+
+def test_recurrence_round_trips_through_dict():
+    job = Job("工作日", "07:59:59.999", weekdays=[4, 0, 0], click_interval=0.05)
+    copy = Job.from_dict(job.to_dict())
+    assert copy.weekdays == [0, 4]
+    assert copy.next_run_after(SATURDAY) == job.next_run_after(SATURDAY) == datetime(2026, 10, 19, 7, 59, 59, 999_000)
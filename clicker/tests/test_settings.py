@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from engine import ClickerEngine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    engine = ClickerEngine(coordinates_file=str(tmp_path / 'coordinates.json'),
+                           settings_file=str(tmp_path / 'settings.json'))
+    yield engine
+    engine.clock.close()
+
+
+def write_settings(engine, settings):
+    with open(engine.settings_file, 'w') as f:
+        json.dump(settings, f)
+
+
+def read_settings(engine):
+    with open(engine.settings_file) as f:
+        return json.load(f)
+
+
+def test_defaults_without_file(engine):
+    engine.load_settings()
+    assert list(engine.scheduler.jobs) == ["默认任务"]
+    assert engine.click_interval == 0.1
+
+
+def test_invalid_job_does_not_drop_other_jobs(engine):
+    bad = {'name': "坏任务", 'time': "25:00"}
+    write_settings(engine, {
+        'jobs': [{'name': "早", 'time': "08:00"}, bad, {'name': "无日期", 'date': "2026-13-01"}],
+        'warmup_seconds': 3.0,
+    })
+    engine.load_settings()
+    assert list(engine.scheduler.jobs) == ["早"]
+    assert engine.warmup_seconds == 3.0
+
+    # 保存时无法解析的任务原样写回，用户修正后仍可加载
+    engine.save_settings()
+    saved = read_settings(engine)['jobs']
+    assert [job['name'] for job in saved] == ["早", "坏任务", "无日期"]
+    assert saved[1] == bad
+
+
+def test_invalid_fields_fall_back_individually(engine):
+    write_settings(engine, {
+        'jobs': [{'name': "早", 'time': "08:00"}],
+        'click_interval': "fast",
+        'display_timezone': 8,
+        'sync_mode': "slow",
+        'executor': "process",
+        'double_clicks': 0,
+        'time_servers': "ntp://example.com",
+        'log_level': "debug",
+    })
+    engine.load_settings()
+    assert engine.click_interval == 0.1
+    assert engine.display_timezone == "+08:00"
+    assert engine.sync_mode == "bracket"
+    assert engine.executor == "process"
+    assert engine.double_clicks == 2
+    assert engine.time_servers is None
+    assert engine.log_level == "debug"
+    assert list(engine.scheduler.jobs) == ["早"]
+
+
+def test_unreadable_file_is_kept(engine):
+    with open(engine.settings_file, 'w') as f:
+        f.write('{"jobs": [')
+    engine.load_settings()
+    assert list(engine.scheduler.jobs) == ["默认任务"]
+    assert os.path.exists(engine.settings_file + '.corrupt')
+    assert not os.path.exists(engine.settings_file)
@@ -0,0 +1,115 @@
+import socket
+import time
+
+import pytest
+
+from clock_sync import ClockSync, HEALTH_MIN, PROBATION_ROUNDS
+from fake_ntp_server import FakeNtpServer, to_ntp
+from sntp import SntpConnection, ntp_to_us, NTP_ERA_US, NTP_EPOCH_OFFSET
+
+
+def local_us():
+    return time.time_ns() // 1000
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(**kwargs):
+        server = FakeNtpServer(**kwargs).start()
+        started.append(server)
+        return server
+    yield start
+    for server in started:
+        server.stop()
+
+
+@pytest.fixture
+def silent_url():
+    """收到请求后从不应答的UDP端口（模拟被封锁的123端口）"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    yield f"ntp://127.0.0.1:{sock.getsockname()[1]}"
+    sock.close()
+
+
+def test_ntp_timestamp_conversion():
+    assert ntp_to_us(to_ntp(1_700_000_000.5), 1_700_000_000 * 1_000_000) == 1_700_000_000_500_000
+    # 2036年NTP秒字段回绕后，按本地时间选择纪元
+    after_rollover = 2_085_978_496 + 100    # 2036-02-07 06:28:16 UTC 之后100秒
+    wrapped = to_ntp(after_rollover) & ((1 << 64) - 1)
+    assert ntp_to_us(wrapped, after_rollover * 1_000_000) == after_rollover * 1_000_000
+    assert ntp_to_us(wrapped, -NTP_EPOCH_OFFSET * 1_000_000) == after_rollover * 1_000_000 - NTP_ERA_US
+
+
+def test_four_timestamp_math(monkeypatch):
+    conn = SntpConnection('ntp://127.0.0.1:1')
+    replies = iter([
+        (0, 1_500, 1_600, 400, 10),       # 时延 300
+        (1_000, 2_100, 2_200, 1_300, 10), # 时延 200：取这一次
+        (2_000, 3_300, 3_400, 2_500, 10), # 时延 400
+    ])
+    monkeypatch.setattr(conn, 'query', lambda clock, timeout=None: next(replies))
+    mid, offset, delay, error = conn.sample(local_us, count=3)
+    assert delay == 200
+    assert offset == ((2_100 - 1_000) + (2_200 - 1_300)) / 2
+    assert mid == 1_000 + 300 // 2
+    assert error == 200 / 2 + 10
+
+
+def test_offset_against_loopback_server(servers):
+    server = servers(offset=0.25, delay=0.02)
+    conn = SntpConnection(server.url)
+    try:
+        _, offset, delay, error = conn.sample(local_us)
+    finally:
+        conn.close()
+    assert abs(offset - 250_000) < 2_000
+    assert delay < 15_000             # 服务器处理时间不计入往返时延
+    assert abs(offset - 250_000) <= error + 1_000
+
+
+@pytest.mark.parametrize('kwargs', [{'stratum': 0}, {'leap': 3}])
+def test_unsynchronised_server_is_rejected(servers, kwargs):
+    conn = SntpConnection(servers(**kwargs).url)
+    try:
+        with pytest.raises(ValueError):
+            conn.query(local_us)
+    finally:
+        conn.close()
+
+
+def test_first_timeout_raises(silent_url):
+    conn = SntpConnection(silent_url, timeout=0.2)
+    try:
+        with pytest.raises(socket.timeout):
+            conn.sample(local_us)
+    finally:
+        conn.close()
+
+
+def test_lost_packets_after_first_reply_use_short_timeout(servers):
+    server = servers(answer_first=1)
+    conn = SntpConnection(server.url, timeout=2)
+    try:
+        start = time.monotonic()
+        conn.sample(local_us, count=4)
+        elapsed = time.monotonic() - start
+    finally:
+        conn.close()
+    assert server.requests == 4
+    assert elapsed < 1.5              # 3次丢包各等0.2秒，而不是各等2秒
+
+
+def test_timed_out_server_leaves_rotation_at_once(servers, silent_url):
+    good = servers(offset=0.1)
+    clock = ClockSync(servers=[good.url, silent_url], timeout=0.3)
+    try:
+        assert clock.sync_once()
+        assert clock.health[silent_url] < HEALTH_MIN
+        assert clock.health[good.url] == 1.0
+        rounds = [silent_url in clock.active_servers() for _ in range(PROBATION_ROUNDS)]
+        assert rounds.count(True) == 1    # 只在试探轮次重新参与
+    finally:
+        clock.close()
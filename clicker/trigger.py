@@ -0,0 +1,71 @@
+import sys
+import threading
+import time
+
+# 最后阶段自旋等待的时长：Windows默认计时器精度约15.6ms，需要更长的自旋窗口
+DEFAULT_SPIN_US = 20000 if sys.platform == 'win32' else 3000
+MAX_COARSE_SLEEP = 0.5            # 粗等待单次最长睡眠(秒)，期间会重新读取时钟模型
+
+
+class PrecisionTrigger:
+    """
+    一次性精确触发器
+    先按网络时钟粗略睡眠到目标前几毫秒，再对 perf_counter 自旋等待，
+    到点后在当前线程直接调用回调，并记录实际触发时刻相对目标的误差
+    """
+
+    def __init__(self, clock, spin_us=DEFAULT_SPIN_US):
+        """
+        Args:
+            clock: ClockSync 实例，提供 now_us()
+            spin_us: 自旋等待窗口(微秒)
+        """
+        self.clock = clock
+        self.spin_us = spin_us
+        self.generation = 0                     # 每次 cancel() 加1，等待开始前记下的代数过期即放弃等待
+        self._cond = threading.Condition()
+        self.last_error_us = None               # 最近一次触发误差(微秒)，正数表示迟到
+        self.last_deadline_ns = None            # 最近一次触发的计划时刻(perf_counter_ns)
+        self.last_fire_ns = None                # 最近一次触发的实际时刻(perf_counter_ns)
+
+    def cancel(self):
+        """取消正在进行的等待，以及代数在此之前记下、尚未开始的等待"""
+        with self._cond:
+            self.generation += 1
+            self._cond.notify_all()
+
+    def wait(self, target_us, callback=None, generation=None):
+        """
+        等待到目标网络时间后触发
+        Args:
+            target_us: 目标时刻（网络时间，微秒，Unix纪元）
+            callback: 到点后直接调用的函数
+            generation: 调用方读取目标前记下的 self.generation，之后的 cancel() 都会使本次等待作废；
+                        为None时使用当前代数
+        Returns:
+            触发误差(微秒)；等待被取消时返回None
+        """
+        if generation is None:
+            generation = self.generation
+
+        # 粗等待：每次醒来都重新读取时钟模型，后台同步对偏移的修正可以及时生效
+        while True:
+            with self._cond:
+                if self.generation != generation:
+                    return None
+                remaining = target_us - self.clock.now_us()
+                if remaining <= self.spin_us:
+                    break
+                self._cond.wait(min((remaining - self.spin_us) / 1_000_000, MAX_COARSE_SLEEP))
+
+        # 精等待：换算成一次 perf_counter 截止时间后自旋
+        deadline_ns = time.perf_counter_ns() + (target_us - self.clock.now_us()) * 1000
+        while time.perf_counter_ns() < deadline_ns:
+            pass
+
+        self.last_fire_ns = time.perf_counter_ns()
+        self.last_deadline_ns = deadline_ns
+        self.last_error_us = self.clock.now_us() - target_us
+        if callback is not None:
+            callback()
+        return self.last_error_us
@@ -0,0 +1,222 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+def format_coordinate(index, point):
+    return f"坐标 {index+1}: ({point[0]}, {point[1]})"
+
+
+class VirtualList(ttk.Frame):
+    """
+    虚拟化的列表控件
+    数据只保存在 Python 列表中，Listbox 里始终只有当前可见的几行，滚动时重新填充，
+    行数再多也不会拖慢界面或占用大量 Tk 内存；支持过滤、多选和按修改通知增量更新
+    选择和删除使用的都是数据中的序号，与过滤和滚动位置无关
+    """
+
+    def __init__(self, master, height=10, width=40, formatter=format_coordinate):
+        """
+        Args:
+            master: 父控件
+            height: 可见行数
+            width: 宽度(字符)
+            formatter: formatter(序号, 数据) -> 显示文字
+        """
+        super().__init__(master)
+        self.height = height
+        self.formatter = formatter
+        self.rows = []              # 全部数据
+        self._view = None           # 过滤后可见数据的序号列表，None表示不过滤
+        self._filter = ""
+        self._top = 0               # 第一行可见行在视图中的位置
+        self.selected = set()       # 选中的数据序号
+        self._anchor = None         # Shift范围选择的起点（数据序号）
+
+        self.listbox = tk.Listbox(self, height=height, width=width, selectmode=tk.EXTENDED,
+                                  exportselection=False)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        # 用自己的选择和滚动逻辑代替 Listbox 默认行为
+        self.listbox.bind('<Button-1>', lambda e: self.on_click(e, extend=False, toggle=False))
+        self.listbox.bind('<Shift-Button-1>', lambda e: self.on_click(e, extend=True, toggle=False))
+        self.listbox.bind('<Control-Button-1>', lambda e: self.on_click(e, extend=False, toggle=True))
+        self.listbox.bind('<B1-Motion>', lambda e: self.on_click(e, extend=True, toggle=False))
+        self.listbox.bind('<Control-a>', lambda e: self.select_all())
+        self.listbox.bind('<MouseWheel>', lambda e: self.scroll(-1 if e.delta > 0 else 1, 'units'))
+        self.listbox.bind('<Button-4>', lambda e: self.scroll(-1, 'units'))
+        self.listbox.bind('<Button-5>', lambda e: self.scroll(1, 'units'))
+        self.listbox.bind('<Prior>', lambda e: self.scroll(-1, 'pages'))
+        self.listbox.bind('<Next>', lambda e: self.scroll(1, 'pages'))
+
+    # ---- 数据 ----
+
+    def view_size(self):
+        return len(self._view) if self._view is not None else len(self.rows)
+
+    def _row_at(self, position):
+        """视图中的位置 -> 数据序号"""
+        return self._view[position] if self._view is not None else position
+
+    def set_rows(self, rows):
+        """整体替换数据"""
+        self.rows = list(rows)
+        self.selected = set()
+        self._anchor = None
+        self._refilter()
+
+    def apply_changes(self, changes):
+        """
+        按修改通知增量更新，一次通知中的多段修改依次应用后只重新过滤和显示一次
+        Args:
+            changes: [(修改开始的序号, 删除的行数, 在该序号处插入的数据), ...]
+        """
+        if len(changes) == 1:
+            index, removed, items = changes[0]
+            self.rows[index:index + removed] = items
+            shift = len(items) - removed
+            if shift or removed:
+                # 修改区间之后的选中行随之移动，被替换的行取消选中
+                self.selected = {i if i < index else i + shift
+                                 for i in self.selected if i < index or i >= index + removed}
+                if self._anchor is not None and self._anchor >= index:
+                    self._anchor = None
+        else:
+            # 多段修改（如删除分散的多行）：记录每行修改前的序号，最后一次换算选中行
+            origin = list(range(len(self.rows)))
+            for index, removed, items in changes:
+                self.rows[index:index + removed] = items
+                origin[index:index + removed] = [-1] * len(items)
+            selected, anchor = self.selected, self._anchor
+            self.selected = set()
+            self._anchor = None
+            for i, j in enumerate(origin):
+                if j in selected:
+                    self.selected.add(i)
+                if j == anchor:
+                    self._anchor = i
+        if self._view is not None:
+            self._refilter()
+        else:
+            self._clamp_top()
+            self.render()
+
+    # ---- 过滤 ----
+
+    def set_filter(self, text):
+        """
+        只显示文字中包含 text 的行；输入 "a-b" 时显示序号 a 到 b（从1开始）的行
+        """
+        self._filter = text.strip()
+        self._top = 0
+        self._refilter()
+
+    def _refilter(self):
+        text = self._filter
+        if not text:
+            self._view = None
+        else:
+            low, sep, high = text.partition('-')
+            if sep and low.strip().isdigit() and high.strip().isdigit():
+                start = max(0, int(low) - 1)
+                self._view = list(range(start, min(len(self.rows), int(high))))
+            else:
+                self._view = [i for i, row in enumerate(self.rows) if text in self.formatter(i, row)]
+        self._clamp_top()
+        self.render()
+
+    # ---- 滚动与显示 ----
+
+    def _clamp_top(self):
+        self._top = max(0, min(self._top, self.view_size() - self.height))
+
+    def scroll(self, amount, what='units'):
+        self._top += amount * (self.height if what == 'pages' else 1)
+        self._clamp_top()
+        self.render()
+        return 'break'
+
+    def on_scrollbar(self, action, *args):
+        """滚动条回调：('moveto', 比例) 或 ('scroll', 数量, 'units'/'pages')"""
+        if action == 'moveto':
+            self._top = int(float(args[0]) * self.view_size())
+            self._clamp_top()
+            self.render()
+        elif action == 'scroll':
+            self.scroll(int(args[0]), args[1])
+
+    def see(self, index):
+        """滚动到数据序号 index 所在的行"""
+        if self._view is not None:
+            if index not in self._view:
+                return
+            index = self._view.index(index)
+        if not self._top <= index < self._top + self.height:
+            self._top = index - self.height // 2
+            self._clamp_top()
+            self.render()
+
+    def render(self):
+        """用当前窗口内的行重新填充 Listbox"""
+        size = self.view_size()
+        stop = min(size, self._top + self.height)
+        listbox = self.listbox
+        listbox.delete(0, tk.END)
+        listbox.insert(tk.END, *(self.formatter(self._row_at(p), self.rows[self._row_at(p)])
+                                 for p in range(self._top, stop)))
+        listbox.selection_clear(0, tk.END)
+        for position in range(self._top, stop):
+            if self._row_at(position) in self.selected:
+                listbox.selection_set(position - self._top)
+        if size:
+            self.scrollbar.set(self._top / size, stop / size)
+        else:
+            self.scrollbar.set(0, 1)
+
+    # ---- 选择 ----
+
+    def on_click(self, event, extend, toggle):
+        position = self._top + self.listbox.nearest(event.y)
+        if position >= self.view_size():
+            return 'break'
+        self.click(self._row_at(position), extend, toggle)
+        self.listbox.focus_set()
+        return 'break'
+
+    def click(self, index, extend=False, toggle=False):
+        """
+        按普通点击/Shift点击/Ctrl点击的规则修改选择
+        Args:
+            index: 点击的数据序号
+            extend: 从上次点击的行到 index 范围选择（只包括当前过滤结果中的行）
+            toggle: 切换 index 的选中状态
+        """
+        if extend and self._anchor is not None:
+            low, high = sorted((self._anchor, index))
+            if self._view is None:
+                self.selected = set(range(low, high + 1))
+            else:
+                self.selected = {i for i in self._view if low <= i <= high}
+        elif toggle:
+            self.selected ^= {index}
+            self._anchor = index
+        else:
+            self.selected = {index}
+            self._anchor = index
+        self.render()
+
+    def select_all(self):
+        """选中当前过滤结果中的所有行"""
+        self.selected = set(self._view) if self._view is not None else set(range(len(self.rows)))
+        self.render()
+        return 'break'
+
+    def clear_selection(self):
+        self.selected = set()
+        self._anchor = None
+        self.render()
+
+    def curselection(self):
+        """选中的数据序号（升序）"""
+        return sorted(self.selected)